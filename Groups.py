@@ -63,6 +63,18 @@ class RigSelectorProperties(PropertyGroup):
         max = 5.0,
         default = 1.0)
     
+    # Draw each interface with a single packed batch
+    batching: BoolProperty(
+        name="BatchingRigSelector",
+        description="Draw each interface with a single batch",
+        default = True)
+    
+    # Apply only the latest mouse position while dragging
+    coalesce: BoolProperty(
+        name="CoalesceRigSelector",
+        description="Apply mouse moves at most once per frame while dragging",
+        default = True)
+    
     # Change background alpha
     alpha: FloatProperty(
         name="AlphaRigSelector",
@@ -102,6 +114,13 @@ class RigSelectorProperties(PropertyGroup):
         name="Autosave",
         description="Enables autosaving the rig",
         default = False)
+    
+    # Record render statistics
+    profiling: BoolProperty(
+        name="ProfilingRigSelector",
+        description="Record frame cost of the rig selector",
+        default = False,
+        update = Operators.toggleProfiling)
 
 ####################################################################################
 
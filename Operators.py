@@ -1,10 +1,17 @@
 
 import bpy
 import json
+import math
 
 from bpy.types import Operator
 
 from .Widgets.Base import Util
+from .Widgets.Base import State
+from .Widgets.Base import Backend
+from .Widgets.Base import Textures
+from .Widgets.Base import Profiler
+from .Widgets.Base import Commands
+from .Widgets.Base import Packer
 from .Widgets import Selectors
 from .Widgets import Surfaces
 from .Widgets.Base import Base
@@ -24,6 +31,20 @@ class TGOR_OT_RigSelectorModal(Operator):
     # Current draw handle
     _drawHandle = None
     
+    # Clamping shift of the active interface in the region it was grabbed in
+    _offset = (0.0, 0.0)
+    
+    # Grabbed element receiving hold and drop directly, and the offset from interface space to its parent
+    _captured = None
+    _capturedOffset = (0.0, 0.0)
+    
+    # Latest coalesced mouse position not yet applied and the timer applying it
+    _pending = None
+    _timer = None
+    
+    # Interval at which coalesced mouse moves are applied
+    _coalesceInterval = 1.0 / 60.0
+    
         
     # Destroy all loaded interfaces
     @staticmethod
@@ -33,11 +54,14 @@ class TGOR_OT_RigSelectorModal(Operator):
         TGOR_OT_RigSelectorModal.toggleEnabled(context, False)
         
         # Clear interfaces
+        for interface in Util._interfaces:
+            interface.free()
         Util._interfaces.clear()
         
         # Clear selection
         Util._selectedSelector = None
         Util._selectedInterface = None
+        Util._hoveredSelector = None
     
     # Builds interfaces
     @staticmethod
@@ -52,33 +76,72 @@ class TGOR_OT_RigSelectorModal(Operator):
         if bpy.context.scene.enableRigSelector.autosave:
             TGOR_OT_RigSelectorModal.storeInterfaces(bpy.context)
     
+    # Redraw caches of interfaces whose links look different after anything changed in the scene
     @staticmethod
-    def toggleEnabled(context, active):
+    def onDepsgraphUpdate(scene, depsgraph=None):
+        
+        # Without update info or on scene wide changes every link could be affected
+        names = set()
+        everything = depsgraph is None
+        if depsgraph:
+            for update in depsgraph.updates:
+                if isinstance(update.id, bpy.types.Scene):
+                    everything = True
                 
-        # refresh screen
-        if context.area:
-            context.area.tag_redraw()  
+                # Changed images need their textures recreated
+                if isinstance(update.id, bpy.types.Image):
+                    Textures.refresh(update.id.name)
+                names.add(update.id.name)
+        
+        # Posing only moves bones, skip interfaces where no selection, visibility or colour changed
+        for interface in Util._interfaces:
+            if interface.updateLinks(bpy.context, names, everything):
+                interface.invalidate()
+        
+        # Selected selector follows the active bone while editing
+        if Util._selectedSelector and Util._selectedSelector._edit:
+            Util._selectedSelector.invalidate()
+        
+        # Changes can come without any input reaching our operators, show them right away
+        Util.flushRedraw(bpy.context)
+    
+    @staticmethod
+    def toggleEnabled(context, active):
         
         if active:
                         
             # Set draw handler
             if TGOR_OT_RigSelectorModal._drawHandle is None:
                 
+                # refresh screen
+                Util.requestRedraw()
+                
                 # Add drawing handler
                 TGOR_OT_RigSelectorModal._drawHandle = bpy.types.SpaceView3D.draw_handler_add(TGOR_OT_RigSelectorModal.render, (context,), 'WINDOW', 'POST_PIXEL')
                 
                 # Add storage handler
                 if not TGOR_OT_RigSelectorModal.autostore in bpy.app.handlers.save_pre:
                     bpy.app.handlers.save_pre.append(TGOR_OT_RigSelectorModal.autostore)
+                
+                # Add scene change handler
+                if not TGOR_OT_RigSelectorModal.onDepsgraphUpdate in bpy.app.handlers.depsgraph_update_post:
+                    bpy.app.handlers.depsgraph_update_post.append(TGOR_OT_RigSelectorModal.onDepsgraphUpdate)
                     
         elif not TGOR_OT_RigSelectorModal._drawHandle is None:
             
+            # refresh screen
+            Util.requestRedraw()
+            
             # Reset draw handler
             bpy.types.SpaceView3D.draw_handler_remove(TGOR_OT_RigSelectorModal._drawHandle, 'WINDOW')
             
             # Remove storage handler
             if TGOR_OT_RigSelectorModal.autostore in bpy.app.handlers.save_pre:
                 bpy.app.handlers.save_pre.remove(TGOR_OT_RigSelectorModal.autostore)
+            
+            # Remove scene change handler
+            if TGOR_OT_RigSelectorModal.onDepsgraphUpdate in bpy.app.handlers.depsgraph_update_post:
+                bpy.app.handlers.depsgraph_update_post.remove(TGOR_OT_RigSelectorModal.onDepsgraphUpdate)
                     
             TGOR_OT_RigSelectorModal._drawHandle = None
         
@@ -103,9 +166,33 @@ class TGOR_OT_RigSelectorModal(Operator):
         # Get scale setting
         scaleAll = context.scene.enableRigSelector.scaleAll
         
-        # Draw each interface
-        for interface in interfaces:
-            interface.draw(context, (0, 0), scaleAll)
+        # Draw each interface from its cache, sharing GPU state for all of them
+        backend = Backend.GPUBackend()
+        with Profiler.Frame():
+            with State.DrawPass():
+                for interface in interfaces:
+                    interface.composite(context, scaleAll, backend)
+                TGOR_OT_RigSelectorRegion.drawOutline(context, backend)
+            Profiler.count("stateChanges", State.getFrameChanges())
+        
+        # Release textures of removed or replaced backgrounds
+        Textures.evict({interface._image for interface in interfaces})
+        
+        # Come back for backgrounds whose proxy rebuild got held off while they kept changing
+        outdated = Textures.getOutdated()
+        if outdated and not bpy.app.timers.is_registered(TGOR_OT_RigSelectorModal.rebuildProxies):
+            bpy.app.timers.register(TGOR_OT_RigSelectorModal.rebuildProxies, first_interval=min(outdated.values()))
+    
+    # Redraws interfaces whose background proxies are outdated so they get rebuilt
+    @staticmethod
+    def rebuildProxies():
+        
+        outdated = Textures.getOutdated()
+        for interface in Util._interfaces:
+            if interface._image in outdated:
+                interface.invalidate()
+        Util.flushRedraw(bpy.context)
+        return None
         
     # Add new interface
     @staticmethod
@@ -114,8 +201,8 @@ class TGOR_OT_RigSelectorModal(Operator):
                 
         # Create new interface
         interface = Surfaces.Interface((0.0, 0.0), (256.0, 256.0))   
-        Util._selectedInterface = interface
         interfaces.append(interface)
+        Util.selectInterface(interface)
 
         TGOR_OT_RigSelectorModal.toggleEdit(context, context.scene.enableRigSelector.editing)
         return interface
@@ -127,8 +214,10 @@ class TGOR_OT_RigSelectorModal(Operator):
         if Util._selectedInterface:
             
             # Remove interface
+            Util._selectedInterface.free()
             interfaces.remove(Util._selectedInterface)
             Util._selectedInterface = None
+            Util.requestRedraw()
     
     
     # Remove selected interface
@@ -143,13 +232,11 @@ class TGOR_OT_RigSelectorModal(Operator):
             
             # Update selector for initial link
             selector.updateLink(context)
+            Util._selectedInterface.invalidate()
             
     # Store text file
     @staticmethod
     def storeInterfaces(context):
-    
-        # refresh screen
-        context.area.tag_redraw()
         
         # Create buffer
         buffer = Base.Buffer({})
@@ -173,8 +260,7 @@ class TGOR_OT_RigSelectorModal(Operator):
     def loadInterfaces(context):
         
         # refresh screen
-        if context.area:
-            context.area.tag_redraw()
+        Util.requestRedraw()
         
         # Reset interfaces
         TGOR_OT_RigSelectorModal.destroy(context)
@@ -200,6 +286,8 @@ class TGOR_OT_RigSelectorModal(Operator):
             # Toggle modes
             TGOR_OT_RigSelectorModal.toggleEnabled(context, context.scene.startupRigSelector.enabled)
             TGOR_OT_RigSelectorModal.toggleEdit(context, context.scene.enableRigSelector.editing)
+        
+        Util.flushRedraw(context)
     
     
     # Modal class, handles drag and drop etc
@@ -209,41 +297,80 @@ class TGOR_OT_RigSelectorModal(Operator):
         if self._active is None:
             return {'CANCELLED'}
         
-        # Redraw as interface is probably moving
-        context.area.tag_redraw()
-        
         # Get scale setting
         scaleAll = context.scene.enableRigSelector.scaleAll
         
         # Get mouse offset
-        pos = ((event.mouse_x - context.region.x) / scaleAll, (event.mouse_y - context.region.y) / scaleAll)
+        pos = ((event.mouse_x - context.region.x) / scaleAll - self._offset[0], (event.mouse_y - context.region.y) / scaleAll - self._offset[1])
         
         # Update during drag and drop
         if event.type == 'MOUSEMOVE':
             
-            # Call hold method
-            self._active.hold(context, pos)
+            # Only keep latest position while coalescing, timer applies it
+            if self._timer:
+                self._pending = pos
+            else:
+                self.apply(context, pos)
+        
+        elif event.type == 'TIMER' and event.timer == self._timer:
+            
+            if self._pending:
+                self.apply(context, self._pending)
+                self._pending = None
         
         elif event.type == 'LEFTMOUSE' or event.type == 'RIGHTMOUSE':
                         
             # Drop and end modal
             if event.value == 'RELEASE':
                 
+                # Stop coalescing, release is handled right away
+                if self._timer:
+                    context.window_manager.event_timer_remove(self._timer)
+                    self._timer = None
+                self._pending = None
+                
+                # Catch up with the release position before dropping
+                self.apply(context, pos)
+                
                 # Call dropped method
-                self._active.drop(context, pos)
+                if self._captured:
+                    self._captured.drop(context, (pos[0] - self._capturedOffset[0], pos[1] - self._capturedOffset[1]))
+                self._captured = None
                 self._active = None
+                Util.flushRedraw(context)
                 
                 return {'FINISHED'}                
 
         return {'RUNNING_MODAL'}
     
+    # Moves grabbed element to a mouse position, redraws only if anything moved
+    def apply(self, context, pos):
+        
+        if self._captured:
+            self._captured.hold(context, (pos[0] - self._capturedOffset[0], pos[1] - self._capturedOffset[1]))
+            Util.flushRedraw(context)
+    
+    # Finds the first interface hit at a mouse position in one walk,
+    # returns (interface, region offset, hit path) or None
+    @staticmethod
+    def hitInterfaces(context, pos):
+        
+        for interface in Util._interfaces:
+            
+            # Undo per region clamping
+            offset = interface.getRegionOffset(context)
+            path = interface.hit(context, (pos[0] - offset[0], pos[1] - offset[1]))
+            if path:
+                return (interface, offset, path)
+        
+        return None
+    
     # Starts drag and drop or handles click events
     def invoke(self, context, event):
                     
         # Get enabled checkbox
         enableRigSelector = context.scene.enableRigSelector
         startupRigSelector = context.scene.startupRigSelector
-        interfaces = Util._interfaces
         
         # Make sure operator is enabled
         if(startupRigSelector.enabled == False):
@@ -254,35 +381,297 @@ class TGOR_OT_RigSelectorModal(Operator):
         
         # Get mouse offset
         pos = ((event.mouse_x - context.region.x) / scaleAll, (event.mouse_y - context.region.y) / scaleAll)
-
-        # Deselect only when clicking inside any interface
-        if any([interface.isInside(context, pos) for interface in interfaces]):
-            Util._selectedSelector = None
-            
+        
         # Check if mouse is over custom interface
-        for interface in interfaces:
-            right = event.type == 'RIGHTMOUSE'
-            if interface.press(context, pos, right, event.shift):
-                
-                # Register
-                self._active = interface
-                Util._selectedInterface = interface
+        hit = TGOR_OT_RigSelectorModal.hitInterfaces(context, pos)
+        if hit:
+            interface, offset, path = hit
+            
+            # Deselect only when clicking inside any interface
+            Util.selectSelector(None)
+            
+            # Activate whatever element got hit
+            element, local = path[-1]
+            element.activate(context, local, event.type == 'RIGHTMOUSE', event.shift)
+            
+            # Capture grabbed element, its parent doesn't move while dragging
+            self._captured = None
+            self._capturedOffset = (0.0, 0.0)
+            if element._isGrabbing:
+                self._captured = element
+                if len(path) > 1:
+                    parent = path[-2][1]
+                    self._capturedOffset = (pos[0] - offset[0] - parent[0], pos[1] - offset[1] - parent[1])
+            
+            # Register
+            self._active = interface
+            self._offset = offset
+            Util.selectInterface(interface)
+            
+            # Redraw in case something changed
+            Util.flushRedraw(context)
+            
+            # Register modal
+            if context.object:
                 
-                # Redraw in case something changed
-                context.area.tag_redraw()
+                # Coalesce mouse moves while dragging
+                self._pending = None
+                self._timer = None
+                if self._captured and enableRigSelector.coalesce:
+                    self._timer = context.window_manager.event_timer_add(self._coalesceInterval, window=context.window)
                 
-                # Register modal
-                if context.object:
-                    context.window_manager.modal_handler_add(self)
-                    return {'RUNNING_MODAL'}
-                else:
-                    return {'CANCELLED'}
+                context.window_manager.modal_handler_add(self)
+                return {'RUNNING_MODAL'}
+            else:
+                return {'CANCELLED'}
             
+        # Redraw in case selection was cleared
+        Util.flushRedraw(context)
+        
         # Only interested in mousevenets when hovering over any interface
         return {'PASS_THROUGH'}
 
 ####################################################################################
 
+# Hover operator class
+class TGOR_OT_RigSelectorHover(Operator):
+    """Highlight selector under the mouse"""
+    bl_idname = "view3d.rig_hover"
+    bl_label = "Rig Selector Hover"
+    
+    # Tracks hovered selector, never consumes the event
+    def invoke(self, context, event):
+        
+        # Make sure operator is enabled
+        if not context.scene.startupRigSelector.enabled or Util._interfaces is None:
+            return {'PASS_THROUGH'}
+        
+        # Get mouse offset
+        scaleAll = context.scene.enableRigSelector.scaleAll
+        pos = ((event.mouse_x - context.region.x) / scaleAll, (event.mouse_y - context.region.y) / scaleAll)
+        
+        # First interface with a selector under the mouse wins, like press
+        hovered = None
+        for interface in Util._interfaces:
+            offset = interface.getRegionOffset(context)
+            hovered = interface.hover(context, (pos[0] - offset[0], pos[1] - offset[1]))
+            if hovered:
+                break
+        
+        # Only repaint if hovered selector changed
+        if Util.hoverSelector(hovered):
+            Util.flushRedraw(context)
+        
+        return {'PASS_THROUGH'}
+
+####################################################################################
+
+# Box and lasso operator class
+class TGOR_OT_RigSelectorRegion(Operator):
+    """Select all selectors inside a box or lasso or along a stroke"""
+    bl_idname = "view3d.rig_region"
+    bl_label = "Rig Selector Region Select"
+    
+    lasso: bpy.props.BoolProperty(name="Lasso", default=False)
+    stroke: bpy.props.BoolProperty(name="Stroke", default=False)
+    extend: bpy.props.BoolProperty(name="Extend", default=False)
+    
+    # Outline being drawn in region pixels, whether it is closed and the region it is drawn in
+    _outline = []
+    _closed = True
+    _region = None
+    
+    # Interface the gesture started on and mouse path in region pixels
+    _interface = None
+    _path = []
+    
+    # Draws the current box or lasso outline in its region
+    @staticmethod
+    def drawOutline(context, backend):
+        
+        outline = TGOR_OT_RigSelectorRegion._outline
+        if len(outline) < 2 or context.region.as_pointer() != TGOR_OT_RigSelectorRegion._region:
+            return
+        
+        drawList = Commands.DrawList()
+        packer = Packer.Packer()
+        packer.begin(drawList)
+        if TGOR_OT_RigSelectorRegion._closed:
+            packer.outline(outline, (1.0, 1.0, 1.0, 0.8))
+        else:
+            packer.polyline(outline, (1.0, 1.0, 1.0, 0.8))
+        packer.finish()
+        backend.execute(drawList)
+    
+    # Gets gesture polygon or stroke in region pixels
+    def getPolygon(self, path):
+        
+        if self.lasso or self.stroke:
+            return path
+        
+        (xo, yo), (xc, yc) = path[0], path[-1]
+        return [(xo, yo), (xc, yo), (xc, yc), (xo, yc)]
+    
+    def modal(self, context, event):
+        
+        path = self._path
+        pos = (event.mouse_x - context.region.x, event.mouse_y - context.region.y)
+        
+        if event.type == 'MOUSEMOVE':
+            
+            # Box only keeps its corners, lasso and stroke skip tiny steps
+            if not self.lasso and not self.stroke:
+                path[1:] = [pos]
+            elif abs(pos[0] - path[-1][0]) + abs(pos[1] - path[-1][1]) >= 4:
+                path.append(pos)
+            
+            TGOR_OT_RigSelectorRegion._outline = self.getPolygon(path)
+            Util.requestRedraw()
+            Util.flushRedraw(context)
+        
+        elif event.type in {'LEFTMOUSE', 'RIGHTMOUSE'} and event.value == 'RELEASE':
+            
+            # Resolve whole region at once, then select all links in one batch
+            scaleAll = context.scene.enableRigSelector.scaleAll
+            offset = self._interface.getRegionOffset(context)
+            lasso = [(x / scaleAll - offset[0], y / scaleAll - offset[1]) for x, y in self.getPolygon(path)]
+            if self.stroke:
+                
+                # Select everything the stroke went over, whole selectors for group editing
+                selectors = self._interface.getSelectorsAlong(context, lasso)
+                if self._interface._edit:
+                    self._interface._median._container.selectSelectors(selectors, self.extend)
+                elif Selectors.selectLinks(context, selectors, self.extend):
+                    self._interface.invalidate()
+            
+            elif self._interface._edit:
+                
+                # Select vertices for group editing
+                vertices = self._interface.getVerticesIn(context, lasso)
+                self._interface._median._container.selectVertices(vertices, self.extend)
+            else:
+                selectors = self._interface.getSelectorsIn(context, lasso)
+                if Selectors.selectLinks(context, selectors, self.extend):
+                    self._interface.invalidate()
+            
+            self.reset()
+            Util.flushRedraw(context)
+            return {'FINISHED'}
+        
+        elif event.type in {'ESC'}:
+            self.reset()
+            Util.flushRedraw(context)
+            return {'CANCELLED'}
+        
+        return {'RUNNING_MODAL'}
+    
+    # Removes outline
+    def reset(self):
+        TGOR_OT_RigSelectorRegion._outline = []
+        TGOR_OT_RigSelectorRegion._region = None
+        Util.requestRedraw()
+    
+    def invoke(self, context, event):
+        
+        # Make sure operator is enabled
+        if not context.scene.startupRigSelector.enabled or not Util._interfaces:
+            return {'PASS_THROUGH'}
+        
+        scaleAll = context.scene.enableRigSelector.scaleAll
+        pos = (event.mouse_x - context.region.x, event.mouse_y - context.region.y)
+        
+        # Only start on a shown interface
+        for interface in Util._interfaces:
+            offset = interface.getRegionOffset(context)
+            if interface._shown and interface.isInside(context, (pos[0] / scaleAll - offset[0] - interface._pos[0], pos[1] / scaleAll - offset[1] - interface._pos[1])):
+                self._interface = interface
+                self._path = [pos, pos]
+                TGOR_OT_RigSelectorRegion._closed = not self.stroke
+                TGOR_OT_RigSelectorRegion._region = context.region.as_pointer()
+                context.window_manager.modal_handler_add(self)
+                return {'RUNNING_MODAL'}
+        
+        return {'PASS_THROUGH'}
+
+####################################################################################
+
+# Group transform operator class
+class TGOR_OT_RigSelectorTransform(Operator):
+    """Move, scale, rotate or mirror selected vertices of the selected interface"""
+    bl_idname = "view3d.rig_transform"
+    bl_label = "Rig Selector Transform"
+    
+    mode: bpy.props.EnumProperty(
+        name="Mode",
+        items=(('MOVE', "Move", ""), ('SCALE', "Scale", ""), ('ROTATE', "Rotate", ""), ('MIRROR', "Mirror", "")),
+        default='MOVE')
+    
+    # Container being transformed, selection centre and mouse position the transform started at
+    _container = None
+    _pivot = (0.0, 0.0)
+    _start = (0, 0)
+    
+    @classmethod
+    def poll(cls, context):
+        interface = Util._selectedInterface
+        return interface is not None and interface._edit and len(interface._median._container.getSelection()) > 0
+    
+    # Gets (matrix, offset) for a mouse position, horizontal mouse movement drives scale and rotation
+    def getTransform(self, context, event):
+        
+        scaleAll = context.scene.enableRigSelector.scaleAll
+        dx = (event.mouse_x - self._start[0]) / scaleAll
+        dy = (event.mouse_y - self._start[1]) / scaleAll
+        
+        if self.mode == 'SCALE':
+            factor = max(1.0 + dx / 100.0, 0.0)
+            return (((factor, 0.0), (0.0, factor)), (0.0, 0.0))
+        
+        if self.mode == 'ROTATE':
+            angle = dx / 100.0
+            return (((math.cos(angle), -math.sin(angle)), (math.sin(angle), math.cos(angle))), (0.0, 0.0))
+        
+        return (((1.0, 0.0), (0.0, 1.0)), (dx, dy))
+    
+    def modal(self, context, event):
+        
+        if event.type == 'MOUSEMOVE':
+            matrix, offset = self.getTransform(context, event)
+            self._container.transformSelection(context, matrix, offset, self._pivot)
+            Util.flushRedraw(context)
+        
+        elif event.type in {'LEFTMOUSE', 'RET'} and event.value == 'PRESS':
+            self._container.endTransform()
+            Util.flushRedraw(context)
+            return {'FINISHED'}
+        
+        elif event.type in {'RIGHTMOUSE', 'ESC'} and event.value == 'PRESS':
+            
+            # Put everything back where it started
+            self._container.cancelTransform()
+            Util.flushRedraw(context)
+            return {'CANCELLED'}
+        
+        return {'RUNNING_MODAL'}
+    
+    def invoke(self, context, event):
+        
+        self._container = Util._selectedInterface._median._container
+        self._pivot = self._container.beginTransform()
+        self._start = (event.mouse_x, event.mouse_y)
+        
+        # Mirror is applied right away
+        if self.mode == 'MIRROR':
+            self._container.transformSelection(context, ((-1.0, 0.0), (0.0, 1.0)), (0.0, 0.0), self._pivot)
+            self._container.endTransform()
+            Util.flushRedraw(context)
+            return {'FINISHED'}
+        
+        context.window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+####################################################################################
+
 # Toggles whole system on or off
 def toggleEnabled(self, context):
     
@@ -293,6 +682,8 @@ def toggleEnabled(self, context):
         
     if not self.enabled and context.scene.enableRigSelector.autosave:
         TGOR_OT_RigSelectorModal.storeInterfaces(context)
+    
+    Util.flushRedraw(context)
         
 ####################################################################################
 
@@ -301,6 +692,16 @@ def toggleEdit(self, context):
         
     TGOR_OT_RigSelectorModal.toggleEdit(context, self.editing)
 
+# Toggles recording of render statistics
+def toggleProfiling(self, context):
+    
+    Profiler.setEnabled(self.profiling)
+    
+    # Cached interfaces wouldn't show up in the statistics
+    for interface in Util._interfaces or []:
+        interface.invalidate()
+    Util.flushRedraw(context)
+
 
 ####################################################################################
 
@@ -316,14 +717,15 @@ class TGOR_OT_RigSelectorAdd(Operator):
     
     def execute(self, context):
         
-        # refresh screen
-        context.area.tag_redraw()
         TGOR_OT_RigSelectorModal.addInterface(context)
           
         # Toggle modes
         TGOR_OT_RigSelectorModal.toggleEnabled(context, context.scene.startupRigSelector)
         TGOR_OT_RigSelectorModal.toggleEnabled(context, context.scene.startupRigSelector)
         
+        # refresh screen
+        Util.flushRedraw(context)
+        
         return {'FINISHED'}
 
 # Remove interface operator
@@ -337,14 +739,15 @@ class TGOR_OT_RigSelectorRemove(Operator):
         return True
     
     def execute(self, context):
-        # refresh screen
-        context.area.tag_redraw()
         TGOR_OT_RigSelectorModal.removeInterface(context)
         
         # Toggle modes
         TGOR_OT_RigSelectorModal.toggleEnabled(context, context.scene.startupRigSelector)
         TGOR_OT_RigSelectorModal.toggleEnabled(context, context.scene.startupRigSelector)
         
+        # refresh screen
+        Util.flushRedraw(context)
+        
         return {'FINISHED'}
     
     def invoke(self, context, event):
@@ -363,9 +766,6 @@ class TGOR_OT_RigSelectorAddLayerSelector(Operator):
         return True
     
     def execute(self, context):
-                
-        # Refresh screen
-        context.area.tag_redraw()
         
         # Make sure grid size is viable
         grid = context.scene.enableRigSelector.grid
@@ -393,6 +793,9 @@ class TGOR_OT_RigSelectorAddLayerSelector(Operator):
             TGOR_OT_RigSelectorModal.toggleEnabled(context, context.scene.startupRigSelector)
             TGOR_OT_RigSelectorModal.toggleEnabled(context, context.scene.startupRigSelector)   
         
+        # Refresh screen
+        Util.flushRedraw(context)
+        
         return {'FINISHED'}
     
 
@@ -410,9 +813,6 @@ class TGOR_OT_RigSelectorSetImageSelector(Operator):
         
         if Util._selectedInterface:
             
-            # Refresh screen
-            context.area.tag_redraw()
-            
             # Get background image
             background = context.scene.enableRigSelector.background
             if background and background in bpy.data.images:
@@ -423,8 +823,10 @@ class TGOR_OT_RigSelectorSetImageSelector(Operator):
 
                     size = (max(image.size[0], 32), max(image.size[1], 32))
                     Util._selectedInterface._size = size
-                    Util._selectedInterface._image = image
-                    Util._selectedInterface._background = background
+                    Util._selectedInterface._image = background
+                    Textures.refresh(background)
+                    Textures.buildProxies(background)
+                    Util._selectedInterface.invalidate()
                     
                     # Make sure image doesn't get removed from blend file
                     image.use_fake_user = True
@@ -442,12 +844,14 @@ class TGOR_OT_RigSelectorSetImageSelector(Operator):
             else:
                 
                 # Reset image
-                Util._selectedInterface._image = None
-                Util._selectedInterface._background = ""
+                Util._selectedInterface._image = ""
+                Util._selectedInterface.invalidate()
         
         else:
             self.report({'ERROR'}, "No interface selected")
             
+        # Refresh screen
+        Util.flushRedraw(context)
         
         return {'FINISHED'}
     
@@ -508,6 +912,27 @@ class TGOR_OT_RigSelectorLoad(Operator):
         
         return {'FINISHED'}
 
+# Profile export operator
+class TGOR_OT_RigSelectorExportProfile(Operator):
+    """Export recorded render statistics as JSON"""
+    bl_idname = "view3d.rig_export_profile"
+    bl_label = "Rig Selector Profile Export Operator"
+    
+    @classmethod
+    def poll(cls, context):
+        return True
+    
+    def execute(self, context):
+        
+        if 'RigProfile' in bpy.data.texts:
+            text = bpy.data.texts['RigProfile']
+        else:
+            text = bpy.data.texts.new('RigProfile')
+        
+        text.from_string(Profiler.export())
+        
+        return {'FINISHED'}
+
 # Toggle edit operator
 class TGOR_OT_RigSelectorToggleEdit(Operator):
     """Toggle interfaces edit"""
@@ -534,12 +959,16 @@ class TGOR_OT_RigSelectorToggleEdit(Operator):
 # Store collections for unregister
 classes = [
     TGOR_OT_RigSelectorModal,
+    TGOR_OT_RigSelectorHover,
+    TGOR_OT_RigSelectorRegion,
+    TGOR_OT_RigSelectorTransform,
     TGOR_OT_RigSelectorAdd,
     TGOR_OT_RigSelectorRemove,
     TGOR_OT_RigSelectorAddLayerSelector,
     TGOR_OT_RigSelectorSetImageSelector,
     TGOR_OT_RigSelectorStore,
     TGOR_OT_RigSelectorLoad,
+    TGOR_OT_RigSelectorExportProfile,
     TGOR_OT_RigSelectorToggleEdit,
 ]
 
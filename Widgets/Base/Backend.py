@@ -0,0 +1,156 @@
+import gpu
+from mathutils import Matrix
+from gpu_extras.batch import batch_for_shader
+
+from . import Shaders
+from . import State
+from . import Profiler
+
+####################################################################################
+
+class OffscreenCache():
+    """Offscreen texture an interface is rendered into and the quad compositing it"""
+    
+    # Offscreen target
+    _offscreen = None
+    
+    # Composited quad and the placement it was built for
+    _quad = None
+    _quadKey = None
+    
+    # Constructor
+    def __init__(self, width, height):
+        self._offscreen = gpu.types.GPUOffScreen(width, height)
+    
+    # Gets texture size in pixels
+    def getSize(self):
+        return (self._offscreen.width, self._offscreen.height)
+    
+    # Releases offscreen texture
+    def free(self):
+        
+        if self._offscreen:
+            self._offscreen.free()
+        self._offscreen = None
+        self._quad = None
+        self._quadKey = None
+
+####################################################################################
+
+class GPUBackend():
+    """Executes draw commands with Blender's gpu module"""
+    
+    # Gets largest cache texture size in pixels
+    def getMaxSize(self):
+        return gpu.capabilities.max_texture_size_get()
+    
+    # Renders a draw list into a cache of given size, reuses the cache if the size matches
+    def renderCache(self, cache, width, height, drawList):
+        
+        # (Re)create offscreen if size changed or cache came from another backend
+        if not isinstance(cache, OffscreenCache) or cache.getSize() != (width, height):
+            if cache:
+                cache.free()
+            cache = OffscreenCache(width, height)
+        
+        # Map texture pixels to clip space
+        projection = Matrix((
+            (2.0 / width, 0.0, 0.0, -1.0),
+            (0.0, 2.0 / height, 0.0, -1.0),
+            (0.0, 0.0, 1.0, 0.0),
+            (0.0, 0.0, 0.0, 1.0)))
+        
+        with cache._offscreen.bind():
+            framebuffer = gpu.state.active_framebuffer_get()
+            framebuffer.clear(color=(0.0, 0.0, 0.0, 0.0))
+            
+            with gpu.matrix.push_pop():
+                gpu.matrix.load_matrix(Matrix.Identity(4))
+                gpu.matrix.load_projection_matrix(projection)
+                self.execute(drawList)
+        
+        # Force quad rebuild
+        cache._quadKey = None
+        return cache
+    
+    # Draws a cache as a single textured quad at a pixel position
+    def drawCache(self, cache, xo, yo):
+        
+        width, height = cache.getSize()
+        xc = xo + width
+        yc = yo + height
+        
+        shader = Shaders.getImage()
+        
+        # Rebuild quad only if moved
+        key = (xo, yo, xc, yc)
+        if key != cache._quadKey:
+            cache._quad = batch_for_shader(
+                shader, 'TRI_FAN',
+                {
+                    "pos": ((xo, yo), (xc, yo), (xc, yc), (xo, yc)),
+                    "texCoord": ((0, 0), (1, 0), (1, 1), (0, 1)),
+                },
+            )
+            cache._quadKey = key
+            Profiler.count("batches")
+        
+        # Texture content is premultiplied by blending into a transparent target
+        State.setBlend('ALPHA_PREMULT')
+        shader.bind()
+        shader.uniform_sampler("image", cache._offscreen.texture_color)
+        shader.uniform_float("alpha", 1.0)
+        cache._quad.draw(shader)
+        State.setBlend('ALPHA')
+        Profiler.count("draws")
+    
+    # Executes all commands of a draw list
+    def execute(self, drawList):
+        
+        for command in drawList.getCommands():
+            if command[0] == 'TRIS':
+                self.drawTriangles(*command[1:])
+            elif command[0] == 'IMAGE':
+                self.drawImage(*command[1:])
+    
+    # Draws flat coloured triangles, reuses the slot's batch if the key didn't change
+    def drawTriangles(self, positions, colours, key, slot):
+        
+        shader = Shaders.getBuiltin('FLAT_COLOR')
+        
+        if slot is not None and key is not None and slot.get("key") == key:
+            batch = slot["batch"]
+        else:
+            batch = batch_for_shader(shader, 'TRIS', {"pos": positions, "color": colours})
+            Profiler.count("batches")
+            if slot is not None:
+                slot["key"] = key
+                slot["batch"] = batch
+        
+        shader.bind()
+        batch.draw(shader)
+        Profiler.count("draws")
+    
+    # Draws background image of a rectangle
+    def drawImage(self, rectangle, corners, scale, alpha):
+        
+        texture = rectangle.getImageTexture(scale)
+        if texture is None:
+            return
+        
+        xo, yo, xc, yc = corners
+        shader = Shaders.getImage()
+        batch = batch_for_shader(
+            shader, 'TRI_FAN',
+            {
+                "pos": ((xo, yo), (xc, yo), (xc, yc), (xo, yc)),
+                "texCoord": ((0, 0), (1, 0), (1, 1), (0, 1)),
+            },
+        )
+        Profiler.count("batches")
+        
+        shader.bind()
+        shader.uniform_sampler("image", texture)
+        shader.uniform_float("alpha", alpha)
+        batch.draw(shader)
+        Profiler.count("draws")
@@ -0,0 +1,131 @@
+####################################################################################
+
+class DrawList():
+    """Ordered draw commands of an interface, executed by a backend"""
+    
+    # Commands as tuples, first entry is the command type
+    _commands = []
+    
+    # Constructor
+    def __init__(self):
+        self._commands = []
+    
+    # Removes all commands
+    def clear(self):
+        self._commands = []
+    
+    # Gets all commands in draw order
+    def getCommands(self):
+        return self._commands
+    
+    # Adds flat coloured triangles from (n, 2) positions and (n, 4) colours,
+    # backends may reuse whatever they built last time from a slot if the key didn't change
+    def triangles(self, positions, colours, key = None, slot = None):
+        self._commands.append(('TRIS', positions, colours, key, slot))
+    
+    # Adds background image of a rectangle covering (xo, yo, xc, yc) drawn at given scale
+    def image(self, rectangle, corners, scale, alpha):
+        self._commands.append(('IMAGE', rectangle, corners, scale, alpha))
+
+####################################################################################
+
+class RecordedCache():
+    """Stands in for an offscreen texture when recording"""
+    
+    # Texture size in pixels
+    _size = (0, 0)
+    
+    # Constructor
+    def __init__(self, width, height):
+        self._size = (width, height)
+    
+    # Gets texture size in pixels
+    def getSize(self):
+        return self._size
+    
+    # Nothing to release
+    def free(self):
+        pass
+
+class Recorder():
+    """Counts draw commands instead of executing them, for headless benchmarks and tests"""
+    
+    # Counted renders, composites, commands, draws, primitives, vertices and state changes
+    _counters = {}
+    
+    # Currently set blend mode
+    _blend = None
+    
+    # Largest cache texture size in pixels
+    _maxSize = 16384
+    
+    # Constructor
+    def __init__(self):
+        self.reset()
+    
+    # Sets all counters to zero
+    def reset(self):
+        self._counters = {"renders": 0, "composites": 0, "commands": 0, "draws": 0,
+                            "primitives": 0, "vertices": 0, "stateChanges": 0}
+        self._blend = None
+    
+    # Gets a copy of all counters
+    def getCounters(self):
+        return dict(self._counters)
+    
+    # Counts blend mode changes
+    def setBlend(self, mode):
+        
+        if mode != self._blend:
+            self._blend = mode
+            self._counters["stateChanges"] += 1
+    
+    # Starts a pass, state left behind is unknown like in State.DrawPass
+    def beginPass(self, mode = 'ALPHA'):
+        self._blend = None
+        self.setBlend(mode)
+    
+    # Ends a pass, leaves blending disabled
+    def endPass(self):
+        self.setBlend('NONE')
+    
+    # Counts a draw call of given triangle count
+    def countDraw(self, primitives):
+        self._counters["draws"] += 1
+        self._counters["primitives"] += primitives
+        self._counters["vertices"] += primitives * 3
+    
+    # Gets largest cache texture size in pixels
+    def getMaxSize(self):
+        return self._maxSize
+    
+    # Records rendering a draw list into a cache of given size
+    def renderCache(self, cache, width, height, drawList):
+        
+        if not isinstance(cache, RecordedCache) or cache.getSize() != (width, height):
+            if cache:
+                cache.free()
+            cache = RecordedCache(width, height)
+        
+        self._counters["renders"] += 1
+        self.execute(drawList)
+        return cache
+    
+    # Records compositing a cache at a pixel position
+    def drawCache(self, cache, xo, yo):
+        
+        self._counters["composites"] += 1
+        self.setBlend('ALPHA_PREMULT')
+        self.countDraw(2)
+        self.setBlend('ALPHA')
+    
+    # Records all commands of a draw list, blend mode is left to the pass like GPUBackend does
+    def execute(self, drawList):
+        
+        for command in drawList.getCommands():
+            self._counters["commands"] += 1
+            
+            if command[0] == 'TRIS':
+                self.countDraw(len(command[1]) // 3)
+            elif command[0] == 'IMAGE':
+                self.countDraw(2)
@@ -0,0 +1,188 @@
+import math
+import numpy
+
+####################################################################################
+
+class Packer():
+    """Packs flat coloured triangles of a whole interface into as few draw commands as possible"""
+    
+    # Draw list commands get emitted into
+    _drawList = None
+    
+    # Whether all triangles are merged into one command instead of one per primitive
+    _merge = True
+    
+    # Triangle corner positions
+    _positions = []
+    
+    # Triangle corner colours
+    _colours = []
+    
+    # Finished (positions, colours) array chunks, in draw order
+    _chunks = []
+    
+    # Flat handle array (x, y, radius per handle) and handle colours
+    _handles = []
+    _handleColours = []
+    
+    # Backend batch of the handles, kept across frames
+    _handleSlot = None
+    
+    # Expanded handle quads and the handles they were built from
+    _handleArrays = None
+    _handleKey = None
+    
+    # Constructor
+    def __init__(self):
+        self._positions = []
+        self._colours = []
+        self._chunks = []
+        self._handles = []
+        self._handleColours = []
+        self._handleSlot = {}
+    
+    # Starts packing into a draw list, keeps the handle batch for reuse
+    def begin(self, drawList, merge = True):
+        self._drawList = drawList
+        self._merge = merge
+        self._positions = []
+        self._colours = []
+        self._chunks = []
+        self._handles = []
+        self._handleColours = []
+    
+    # Packs ready made float32 (n, 2) triangle corners and (n, 4) colours as they are
+    def chunk(self, positions, colours):
+        
+        if len(positions):
+            
+            # Keep draw order with previously packed triangles
+            self.flush()
+            self._chunks.append((positions, colours))
+            self.split()
+    
+    # Packs an axis aligned rectangle given two corners
+    def rectangle(self, xo, yo, xc, yc, colour):
+        self._positions += ((xo, yo), (xc, yo), (xo, yc), (xo, yc), (xc, yo), (xc, yc))
+        self._colours += [colour] * 6
+        self.split()
+    
+    # Adds quad around a line without ending the primitive
+    def segment(self, a, b, colour, width):
+        
+        # Get line normal
+        dx = b[0] - a[0]
+        dy = b[1] - a[1]
+        length = math.hypot(dx, dy)
+        if length <= 0.0:
+            return
+        
+        nx = -dy / length * width / 2
+        ny = dx / length * width / 2
+        
+        # Generate quad around line
+        p0 = (a[0] + nx, a[1] + ny)
+        p1 = (a[0] - nx, a[1] - ny)
+        p2 = (b[0] + nx, b[1] + ny)
+        p3 = (b[0] - nx, b[1] - ny)
+        self._positions += (p0, p1, p2, p2, p1, p3)
+        self._colours += [colour] * 6
+    
+    # Packs many lines at once from an (n, 2, 2) array of end points
+    def lines(self, lines, colour, width = 1.0):
+        
+        # Get line normals
+        a = lines[:, 0]
+        b = lines[:, 1]
+        diff = b - a
+        length = numpy.hypot(diff[:, 0], diff[:, 1])[:, None]
+        normal = numpy.stack((-diff[:, 1], diff[:, 0]), axis=1) / numpy.maximum(length, 1e-6) * (width / 2)
+        
+        # Generate quads around lines
+        quads = numpy.stack((a + normal, a - normal, b + normal, b + normal, a - normal, b - normal), axis=1).reshape(-1, 2)
+        colours = numpy.empty((len(quads), 4), dtype=numpy.float32)
+        colours[:] = colour
+        
+        # Keep draw order with previously packed triangles
+        self.flush()
+        self._chunks.append((quads.astype(numpy.float32), colours))
+        self.split()
+    
+    # Packs an open line strip
+    def polyline(self, vertices, colour, width = 1.0):
+        for i in range(1, len(vertices)):
+            self.segment(vertices[i - 1], vertices[i], colour, width)
+        self.split()
+    
+    # Packs the closed outline of a polygon
+    def outline(self, vertices, colour, width = 1.0):
+        for i in range(0, len(vertices)):
+            self.segment(vertices[i - 1], vertices[i], colour, width)
+        self.split()
+    
+    # Packs a square handle around a centre, drawn on top of everything else
+    def handle(self, x, y, radius, colour):
+        self._handles += (x, y, radius)
+        self._handleColours.append(colour)
+    
+    # Packs background image of a rectangle, can't be merged as it needs its own shader
+    def image(self, rectangle, corners, scale, alpha):
+        self.emit()
+        self._drawList.image(rectangle, corners, scale, alpha)
+    
+    # Moves packed triangles into a finished chunk
+    def flush(self):
+        
+        if self._positions:
+            self._chunks.append((numpy.array(self._positions, dtype=numpy.float32), numpy.array(self._colours, dtype=numpy.float32)))
+            self._positions = []
+            self._colours = []
+    
+    # Ends a primitive, emits it on its own if not merging
+    def split(self):
+        if not self._merge:
+            self.emit()
+    
+    # Emits all finished chunks as one triangle command
+    def emit(self):
+        
+        self.flush()
+        if self._chunks:
+            positions = numpy.concatenate([positions for positions, colours in self._chunks])
+            colours = numpy.concatenate([colours for positions, colours in self._chunks])
+            self._drawList.triangles(positions, colours)
+            self._chunks = []
+    
+    # Emits everything left, handles last so they end up on top
+    def finish(self):
+        
+        self.emit()
+        if not self._handles:
+            return
+        
+        if self._merge:
+            
+            # Quads and backend batch are only rebuilt if handles moved
+            key = (self._handles, self._handleColours)
+            if key != self._handleKey:
+                self._handleArrays = self.buildHandles()
+                self._handleKey = key
+            positions, colours = self._handleArrays
+            self._drawList.triangles(positions, colours, key, self._handleSlot)
+        else:
+            positions, colours = self.buildHandles()
+            for i in range(0, len(self._handleColours)):
+                self._drawList.triangles(positions[i * 6:i * 6 + 6], colours[i * 6:i * 6 + 6])
+    
+    # Expands the flat handle array into quads
+    def buildHandles(self):
+        
+        # Corners of a unit quad as two triangles
+        corners = numpy.array(((-1, -1), (1, -1), (-1, 1), (-1, 1), (1, -1), (1, 1)), dtype=numpy.float32)
+        
+        # Offset corners by each handle centre, scaled by its radius
+        handles = numpy.array(self._handles, dtype=numpy.float32).reshape(-1, 3)
+        positions = handles[:, None, :2] + corners[None, :, :] * handles[:, None, 2:]
+        colours = numpy.repeat(numpy.array(self._handleColours, dtype=numpy.float32), 6, axis=0)
+        
+        return (positions.reshape(-1, 2), colours)
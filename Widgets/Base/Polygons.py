@@ -0,0 +1,130 @@
+import numpy
+
+####################################################################################
+
+class Polygons():
+    """Packed convex polygons answering point queries for many points at once"""
+    
+    # All polygon vertices in order
+    _vertices = []
+    
+    # Start of each polygon in the vertex list, vertex count at the end
+    _offsets = []
+    
+    # Winding sign of each polygon, None if it has less than three vertices
+    _windings = []
+    
+    # Bounding box of each polygon, None if it has less than three vertices
+    _bounds = []
+    
+    # Indices of polygons with at least three vertices
+    _valid = None
+    
+    # Edge start points and directions of valid polygons padded to the longest polygon,
+    # their windings and bounds
+    _starts = None
+    _dirs = None
+    _packedWindings = None
+    _packedBounds = None
+    
+    # Constructor, takes a list of vertex lists
+    def __init__(self, polygons):
+        
+        self._vertices = []
+        self._offsets = []
+        self._windings = []
+        self._bounds = []
+        for polygon in polygons:
+            self._offsets.append(len(self._vertices))
+            self._vertices += [(float(x), float(y)) for x, y in polygon]
+            
+            if len(polygon) >= 3:
+                a, b, c = polygon[0], polygon[1], polygon[2]
+                self._windings.append((b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]))
+                xs = [x for x, y in polygon]
+                ys = [y for x, y in polygon]
+                self._bounds.append((min(xs), min(ys), max(xs), max(ys)))
+            else:
+                self._windings.append(None)
+                self._bounds.append(None)
+        self._offsets.append(len(self._vertices))
+        self.pack()
+    
+    # Packs edges of all valid polygons into arrays
+    def pack(self):
+        
+        valid = [index for index, winding in enumerate(self._windings) if winding is not None]
+        self._valid = numpy.array(valid, dtype=numpy.int64)
+        if not valid:
+            return
+        
+        # Edges go from the previous vertex to each vertex like Selector.isInside,
+        # shorter polygons repeat their last edge which doesn't change the result
+        vertices = numpy.array(self._vertices, dtype=numpy.float64).reshape(-1, 2)
+        edges = max(self._offsets[index + 1] - self._offsets[index] for index in valid)
+        ends = numpy.empty((len(valid), edges), dtype=numpy.int64)
+        starts = numpy.empty((len(valid), edges), dtype=numpy.int64)
+        for i, index in enumerate(valid):
+            first = self._offsets[index]
+            last = self._offsets[index + 1]
+            ends[i, :last - first] = numpy.arange(first, last)
+            ends[i, last - first:] = last - 1
+            starts[i] = numpy.where(ends[i] > first, ends[i] - 1, last - 1)
+        
+        self._starts = vertices[starts]
+        self._dirs = vertices[ends] - self._starts
+        self._packedWindings = numpy.array([self._windings[index] for index in valid], dtype=numpy.float64)
+        self._packedBounds = numpy.array([self._bounds[index] for index in valid], dtype=numpy.float64)
+    
+    # Gets index of the first polygon containing each point, -1 where there is none,
+    # polygons can be excluded with a mask of one bool per polygon. Tests all points against all polygons in one pass
+    def query(self, points, mask = None):
+        
+        points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 2)
+        result = numpy.full(len(points), -1, dtype=numpy.int64)
+        if not len(self._valid):
+            return result.tolist()
+        
+        # Reject by bounding box, leaves (point, polygon) candidate pairs sorted by point then polygon
+        bounds = self._packedBounds
+        candidates = ((points[:, None, 0] >= bounds[None, :, 0]) & (points[:, None, 0] <= bounds[None, :, 2]) &
+                      (points[:, None, 1] >= bounds[None, :, 1]) & (points[:, None, 1] <= bounds[None, :, 3]))
+        if mask is not None:
+            candidates &= numpy.asarray(mask, dtype=bool)[self._valid][None, :]
+        pointIndices, polygonIndices = numpy.nonzero(candidates)
+        if not len(pointIndices):
+            return result.tolist()
+        
+        # Point is inside if it is on the inner side of all edges of a candidate
+        rel = points[pointIndices][:, None, :] - self._starts[polygonIndices]
+        dirs = self._dirs[polygonIndices]
+        cross = dirs[:, :, 0] * rel[:, :, 1] - dirs[:, :, 1] * rel[:, :, 0]
+        inside = numpy.all(cross * self._packedWindings[polygonIndices][:, None] >= 0.0, axis=1)
+        
+        # First polygon in order wins
+        pointIndices = pointIndices[inside]
+        polygonIndices = polygonIndices[inside]
+        hit, first = numpy.unique(pointIndices, return_index=True)
+        result[hit] = self._valid[polygonIndices[first]]
+        return result.tolist()
+
+####################################################################################
+
+# Checks which points lie inside an arbitrary (also concave) polygon by even-odd rule
+def contains(polygon, points):
+    
+    if len(polygon) < 3:
+        return [False] * len(points)
+    
+    polygon = numpy.asarray(polygon, dtype=numpy.float64).reshape(-1, 2)
+    points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 2)
+    a = polygon[None, :, :]
+    b = numpy.roll(polygon, -1, axis=0)[None, :, :]
+    x = points[:, None, 0]
+    y = points[:, None, 1]
+    
+    # Count edges crossed by a ray to the right of each point, spanning edges are never horizontal
+    spans = (a[:, :, 1] > y) != (b[:, :, 1] > y)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        crossing = a[:, :, 0] + (y - a[:, :, 1]) * (b[:, :, 0] - a[:, :, 0]) / (b[:, :, 1] - a[:, :, 1])
+    return numpy.logical_xor.reduce(spans & (x < crossing), axis=1).tolist()
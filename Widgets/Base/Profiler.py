@@ -0,0 +1,118 @@
+import time
+import json
+import functools
+import collections
+
+####################################################################################
+
+# Whether anything gets recorded
+_enabled = False
+
+# Recorded frames, oldest get dropped once full
+_frames = collections.deque(maxlen=256)
+
+# Frame currently being recorded, None outside of a frame
+_frame = None
+
+####################################################################################
+
+# Enables or disables recording, clears recorded frames
+def setEnabled(enabled):
+    global _enabled, _frame
+    
+    _enabled = enabled
+    _frame = None
+    _frames.clear()
+
+# Adds to a counter of the current frame (draw calls, batch rebuilds, elements)
+def count(name, amount=1):
+    
+    if _frame is not None:
+        counters = _frame["counters"]
+        counters[name] = counters.get(name, 0) + amount
+
+# Adds wall time and a call of a section to the current frame
+def addSection(name, seconds):
+    
+    if _frame is not None:
+        section = _frame["sections"].setdefault(name, [0.0, 0])
+        section[0] += seconds
+        section[1] += 1
+
+# Decorator recording wall time of a method as named section
+def timed(name):
+    
+    def decorator(method):
+        
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            
+            if _frame is None:
+                return method(*args, **kwargs)
+            
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                addSection(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+# Gets a percentile of sorted values
+def percentile(values, fraction):
+    
+    if not values:
+        return 0.0
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+# Gets frame cost and average per frame section and counter statistics of all recorded frames
+def getStats():
+    
+    frames = list(_frames)
+    times = sorted(frame["time"] for frame in frames)
+    stats = {
+        "frames": len(frames),
+        "p50": percentile(times, 0.5),
+        "p95": percentile(times, 0.95),
+        "max": times[-1] if times else 0.0,
+        "sections": {},
+        "counters": {},
+    }
+    
+    for frame in frames:
+        for name, section in frame["sections"].items():
+            entry = stats["sections"].setdefault(name, {"time": 0.0, "calls": 0})
+            entry["time"] += section[0] / len(frames)
+            entry["calls"] += section[1] / len(frames)
+        for name, amount in frame["counters"].items():
+            stats["counters"][name] = stats["counters"].get(name, 0.0) + amount / len(frames)
+    return stats
+
+# Gets statistics and all recorded frames as JSON
+def export():
+    return json.dumps({"stats": getStats(), "frames": list(_frames)}, indent=4)
+
+####################################################################################
+
+class Frame():
+    """Records statistics of everything drawn inside as one frame"""
+    
+    # Frame start time
+    _start = 0.0
+    
+    def __enter__(self):
+        global _frame
+        
+        if _enabled:
+            _frame = {"time": 0.0, "sections": {}, "counters": {}}
+            self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, type, value, traceback):
+        global _frame
+        
+        if _frame is not None:
+            _frame["time"] = time.perf_counter() - self._start
+            _frames.append(_frame)
+            _frame = None
+        return False
@@ -0,0 +1,76 @@
+import gpu
+
+####################################################################################
+
+# Background image vertex shader
+_imageVertex = '''
+
+    uniform mat4 ModelViewProjectionMatrix;
+
+    in vec2 texCoord;
+    in vec2 pos;
+    out vec2 texCoord_interp;
+
+    void main()
+    {
+    gl_Position = ModelViewProjectionMatrix * vec4(pos.xy, 0.0f, 1.0f);
+    gl_Position.z = 1.0;
+    texCoord_interp = texCoord;
+    }
+
+'''
+
+# Background image fragment shader
+_imageFragment = '''
+    in vec2 texCoord_interp;
+    out vec4 fragColor;
+
+    uniform float alpha;
+    uniform sampler2D image;
+
+    void main()
+    {
+    vec4 c = texture(image, texCoord_interp);
+    c.w = c.w * alpha;
+    fragColor = c;
+    }
+
+'''
+
+# Compiled image shader
+_image = None
+
+# Cached builtin shaders by name
+_builtins = {}
+
+# Builtin shader names before Blender 4.0 by current name
+_legacy = {'FLAT_COLOR': '2D_FLAT_COLOR', 'UNIFORM_COLOR': '2D_UNIFORM_COLOR', 'IMAGE': '2D_IMAGE'}
+
+####################################################################################
+
+# Gets the background image shader, compiles it on first use
+def getImage():
+    global _image
+    
+    if _image is None:
+        _image = gpu.types.GPUShader(_imageVertex, _imageFragment)
+    return _image
+
+# Gets a builtin shader by its Blender 4.x name, falls back to the old name on versions before, caches it on first use
+def getBuiltin(name):
+    
+    shader = _builtins.get(name)
+    if shader is None:
+        try:
+            shader = gpu.shader.from_builtin(name)
+        except ValueError:
+            shader = gpu.shader.from_builtin(_legacy[name])
+        _builtins[name] = shader
+    return shader
+
+# Drops all cached shaders
+def unregister():
+    global _image
+    
+    _image = None
+    _builtins.clear()
@@ -0,0 +1,57 @@
+import gpu
+
+####################################################################################
+
+# Currently set blend mode
+_blend = 'NONE'
+
+# State changes issued during the current pass
+_changes = 0
+
+# State changes issued during the last finished pass
+_frameChanges = 0
+
+####################################################################################
+
+# Sets blend mode, skipped if already set
+def setBlend(mode):
+    global _blend, _changes
+    
+    if mode != _blend:
+        gpu.state.blend_set(mode)
+        _blend = mode
+        _changes += 1
+
+# Gets amount of state changes of the last finished pass
+def getFrameChanges():
+    return _frameChanges
+
+
+####################################################################################
+
+class DrawPass():
+    """Sets GPU state once for all elements drawn inside"""
+    
+    # Blend mode used by this pass
+    _mode = 'ALPHA'
+    
+    # Constructor
+    def __init__(self, mode = 'ALPHA'):
+        self._mode = mode
+    
+    def __enter__(self):
+        global _blend, _changes
+        
+        # State left behind by other draw handlers is unknown, always set it
+        _changes = 0
+        _blend = None
+        setBlend(self._mode)
+        return self
+    
+    def __exit__(self, type, value, traceback):
+        global _frameChanges
+        
+        # Leave blending disabled like we found it
+        setBlend('NONE')
+        _frameChanges = _changes
+        return False
@@ -1,9 +1,6 @@
-import gpu
-import bgl
-from gpu_extras.batch import batch_for_shader
-
 from . import Base
 from . import Util
+from . import Textures
        
 
 ####################################################################################
@@ -54,6 +51,26 @@ class Interactable(Base.Writeable):
     def dropped(self, context, pos):
         pass
     
+    # Reports a visual change, redraws the owning interface
+    def invalidate(self):
+        if self._parent:
+            self._parent.invalidate()
+    
+    # Reports a position change of this element
+    def moved(self):
+        self.invalidate()
+    
+    # Reports a geometry change, drops cached bounds up to the owning interface
+    def reshape(self):
+        if self._parent:
+            self._parent.reshape()
+        else:
+            self.invalidate()
+    
+    # Checks whether this element is outside the visible area given its parent position
+    def isCulled(self, context, parent):
+        return False
+    
     # add child
     def addChild(self, child):
     
@@ -81,30 +98,50 @@ class Interactable(Base.Writeable):
         return child
     
     
-    # Handles mouse input, returns true if activated
-    def press(self, context, pos, right, shift):
+    # Gets children that could be hit at a local position, in the order they are checked
+    def getHitCandidates(self, context, pos):
+        return self._children
+    
+    # Finds the element a press would activate in one walk, children first,
+    # returns path from this element down to it as (element, local position) pairs or None if nothing is hit
+    def hit(self, context, pos):
         
         # Get mouse offset
         x = pos[0] - self._pos[0]
         y = pos[1] - self._pos[1]
         
         # Check if inside children
-        for child in self._children:
-            if child.press(context, (x, y), right, shift):
-                return True
-                    
+        for child in self.getHitCandidates(context, (x, y)):
+            path = child.hit(context, (x, y))
+            if path:
+                path.insert(0, (self, (x, y)))
+                return path
+        
         # Check if inside
         if self._active and self._visible and self.isInside(context, (x, y)):
-                                
-            # Check if currently grabbing
-            if self.isGrabZone(context, pos):
-                self._isGrabbing = True
-                self._grab = (x, y)
-            else:
-                self.clicked(context, (x, y), right, shift)
-            
-            return True
+            return [(self, (x, y))]
+        
+        return None
     
+    # Grabs or clicks this element at a local position
+    def activate(self, context, pos, right, shift):
+        
+        # Check if currently grabbing
+        if self.isGrabZone(context, (pos[0] + self._pos[0], pos[1] + self._pos[1])):
+            self._isGrabbing = True
+            self._grab = pos
+        else:
+            self.clicked(context, pos, right, shift)
+    
+    # Handles mouse input, returns true if activated
+    def press(self, context, pos, right, shift):
+        
+        path = self.hit(context, pos)
+        if path:
+            element, local = path[-1]
+            element.activate(context, local, right, shift)
+            return True
+        
         return False
     
     # Handles mouse dragging
@@ -115,8 +152,12 @@ class Interactable(Base.Writeable):
             # Move element with mouse
             x = pos[0] - self._grab[0]
             y = pos[1] - self._grab[1]
-                        
-            self._pos = Util.adaptToGrid((x, y), self._grid)
+            
+            # Only report actual moves, grid snapping swallows most of them
+            pos = Util.adaptToGrid(context, (x, y), self._grid)
+            if tuple(pos) != tuple(self._pos):
+                self._pos = pos
+                self.moved()
             
         else:
             # Get mouse offset
@@ -138,6 +179,7 @@ class Interactable(Base.Writeable):
         # Call dropped event    
         if self._isGrabbing:
             self.dropped(context, (x, y))
+            self.moved()
     
         # Drop no matter if currently dragging or not
         self._isGrabbing = False
@@ -148,19 +190,19 @@ class Interactable(Base.Writeable):
             child.drop(context, (x, y))
         
         
-    # Draw this element
-    def draw(self, context, parent, scale):
-                
+    # Pack this element into an interface wide draw list
+    def pack(self, context, parent, scale, packer):
+        
         # Compute offset position
         x = parent[0] + self._pos[0]
         y = parent[1] + self._pos[1]
         
-        # Draw all children
+        # Pack all children
         for child in self._children:
             
             # Abort if not visible
-            if child._visible:
-                child.draw(context, (x, y), scale)
+            if child._visible and not child.isCulled(context, (x, y)):
+                child.pack(context, (x, y), scale, packer)
         
     @Util.Overrides(Base.Writeable)
     def store(self, context, buffer):
@@ -189,8 +231,8 @@ class Rectangle(Interactable):
     # Width and height of box
     _size = (0.0, 0.0)
     
-    # Background image if loaded
-    _image = None
+    # Background image name, empty for none
+    _image = ""
     
     # Border colour or none for no border
     _border = None
@@ -208,163 +250,40 @@ class Rectangle(Interactable):
     def isInside(self, context, pos):
         return 0.0 <= pos[0] and pos[0] < self._size[0] and 0.0 <= pos[1] and pos[1] < self._size[1]
     
+    # Gets bounding box relative to this rectangle
+    def getBounds(self):
+        return (0.0, 0.0, self._size[0], self._size[1])
+    
+    # Checks whether there is a background image to draw
+    def hasImage(self):
+        return Textures.hasImage(self._image)
+    
+    # Gets background texture for drawing at a given scale
+    def getImageTexture(self, scale):
+        return Textures.getProxy(self._image, self._size[0] * scale, self._size[1] * scale)
+    
     @Util.Overrides(Interactable)
-    def draw(self, context, parent, scale):
-                
-        # Compute actual corners from interface coords
-        xo = parent[0] + self._pos[0]
-        yo = parent[1] + self._pos[1]
-        xc = xo + self._size[0]
-        yc = yo + self._size[1]
+    def pack(self, context, parent, scale, packer):
         
-        # Render image if available
-        if self._image and self._image.has_data:
-            
-            vertex_shader = '''
-
-                uniform mat4 ModelViewProjectionMatrix;
-
-                in vec2 texCoord;
-                in vec2 pos;
-                out vec2 texCoord_interp;
-
-                void main()
-                {
-                gl_Position = ModelViewProjectionMatrix * vec4(pos.xy, 0.0f, 1.0f);
-                gl_Position.z = 1.0;
-                texCoord_interp = texCoord;
-                }
-
-            '''
-            fragment_shader = '''
-                in vec2 texCoord_interp;
-                out vec4 fragColor;
-
-                uniform float alpha;
-                uniform sampler2D image;
-
-                void main()
-                {
-                vec4 c = texture(image, texCoord_interp);
-                c.w = c.w * alpha;
-                fragColor = c;
-                }
-
-            '''
-            shader = gpu.types.GPUShader(vertex_shader, fragment_shader)
-            batch = batch_for_shader(
-                shader, 'TRI_FAN',
-                {
-                    "pos": ((xo * scale, yo * scale), (xc * scale, yo * scale),
-                            (xc * scale, yc * scale), (xo * scale, yc * scale)),
-                    "texCoord": ((0, 0), (1, 0), (1, 1), (0, 1)),
-                },
-            )
-
-            if self._image.gl_load():
-                raise Exception()
-
-            bgl.glActiveTexture(bgl.GL_TEXTURE0)
-            bgl.glBindTexture(bgl.GL_TEXTURE_2D, self._image.bindcode)
-
-            bgl.glEnable(bgl.GL_BLEND)
-            shader.bind()
-            shader.uniform_int("image", 0)
-            shader.uniform_float("alpha", self._colour[3])
-            batch.draw(shader)
-            bgl.glDisable(bgl.GL_BLEND)
-
-        else:
-
-            # Render box
-            vertices = ((xo * scale, yo * scale), (xc * scale, yo * scale),
-                        (xo * scale, yc * scale), (xc * scale, yc * scale))
-
-            indices = ((0, 1, 2), (2, 1, 3))
-
-            shader = gpu.shader.from_builtin('2D_UNIFORM_COLOR')
-            batch = batch_for_shader(shader, 'TRIS', {"pos": vertices}, indices=indices)
-
-            bgl.glEnable(bgl.GL_BLEND)
-            shader.bind()
-            shader.uniform_float("color", self._colour)
-            batch.draw(shader)
-            bgl.glDisable(bgl.GL_BLEND)
-
-
-        # Render border
-        if self._border:
-
-            vertices = (((xo - 10) * scale, (yo - 10) * scale), ((xc + 10) * scale, (yo - 10) * scale),
-                        ((xo - 10) * scale, (yc + 10) * scale), ((xc + 10) * scale, (yc + 10) * scale))
-
-            indices = ((0, 1), (1, 3), (3, 2), (2, 0))
-
-            shader = gpu.shader.from_builtin('2D_UNIFORM_COLOR')
-            batch = batch_for_shader(shader, 'LINES', {"pos": vertices}, indices=indices)
-
-            bgl.glEnable(bgl.GL_BLEND)
-            shader.bind()
-            shader.uniform_float("color", self._border)
-            batch.draw(shader)
-            bgl.glDisable(bgl.GL_BLEND)
-
-
-        '''
-        # Generate box data
-        positions = [[xo, yo], [xo, yc], [xc, yc], [xc, yo]]
-        settings = [bgl.GL_QUADS, bgl.GL_LINE_LOOP]
-                
-        # Render image if available
-        if self._image and self._image.has_data:
-            
-            self._image.gl_load(bgl.GL_NEAREST, bgl.GL_NEAREST)
-            bgl.glColor4f(1.0, 1.0, 1.0, self._colour[3])
-            bgl.glBindTexture(bgl.GL_TEXTURE_2D, self._image.bindcode[0])
-            bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_NEAREST)
-            
-            bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER, bgl.GL_NEAREST)
-            bgl.glEnable(bgl.GL_TEXTURE_2D)
-            bgl.glEnable(bgl.GL_BLEND)
-
-            bgl.glBegin(bgl.GL_QUADS)
-            bgl.glTexCoord2f(0,0)
-            bgl.glVertex2f(xo * scale, yo * scale)
-            bgl.glTexCoord2f(0,1)
-            bgl.glVertex2f(xo * scale, yc * scale)
-            bgl.glTexCoord2f(1,1)
-            bgl.glVertex2f(xc * scale, yc * scale)
-            bgl.glTexCoord2f(1,0)
-            bgl.glVertex2f(xc * scale, yo * scale)
-            bgl.glEnd()
-            bgl.glDisable(bgl.GL_BLEND)
-            bgl.glDisable(bgl.GL_TEXTURE_2D)
-            
-        else:
-        
-            # Render box
-            for mode in settings:
-                bgl.glEnable(bgl.GL_BLEND)
-                bgl.glBegin(mode)
-                bgl.glColor4f(self._colour[0], self._colour[1], self._colour[2], self._colour[3])
-                for x, y in positions:
-                    bgl.glVertex2f(x * scale, y * scale)
-                bgl.glEnd()
-            
-        
-        # Render border
+        # Compute actual corners from interface coords
+        xo = (parent[0] + self._pos[0]) * scale
+        yo = (parent[1] + self._pos[1]) * scale
+        xc = xo + self._size[0] * scale
+        yc = yo + self._size[1] * scale
+        
+        # Pack image instead of box if available, skip invisible boxes
+        if self.hasImage():
+            packer.image(self, (xo, yo, xc, yc), scale, self._colour[3])
+        elif self._colour[3] > 0.0:
+            packer.rectangle(xo, yo, xc, yc, self._colour)
+        
+        # Pack border
         if self._border:
-            positions = [[xo - 10, yo - 10], [xo - 10, yc + 10], [xc + 10, yc + 10], [xc + 10, yo - 10]]
+            offset = 10 * scale
+            packer.outline(((xo - offset, yo - offset), (xc + offset, yo - offset),
+                            (xc + offset, yc + offset), (xo - offset, yc + offset)), self._border)
         
-            bgl.glEnable(bgl.GL_BLEND)
-            bgl.glBegin(bgl.GL_LINE_LOOP)
-            bgl.glColor4f(self._border[0], self._border[1], self._border[2], self._border[3])
-            for x, y in positions:
-                bgl.glVertex2f(x * scale, y * scale)
-            bgl.glEnd()
-        '''
-        
-        super().draw(context, parent, scale)
+        super().pack(context, parent, scale, packer)
         
     @Util.Overrides(Interactable)
     def store(self, context, buffer):
@@ -403,59 +322,27 @@ class Circle(Interactable):
         # Get scale setting
         scaleUI = context.scene.enableRigSelector.scaleUI
         
-        # Check if inside radius
+        # Reject by bounding box before checking radius
         radius = self._radius * scaleUI
+        if abs(pos[0]) >= radius or abs(pos[1]) >= radius:
+            return False
+        
+        # Check if inside radius
         square = (pos[0]*pos[0] + pos[1]*pos[1])
         return square < radius * radius
     
     @Util.Overrides(Interactable)
-    def draw(self, context, parent, scale):
+    def pack(self, context, parent, scale, packer):
         
         # Get scale setting
-        scaleUI = context.scene.enableRigSelector.scaleUI
+        radius = self._radius * context.scene.enableRigSelector.scaleUI
         
-        # Compute actual corners from interface coords (draw diamond shape)
+        # Compute centre from interface coords
         x = parent[0] + self._pos[0]
-        xo = x - self._radius * scaleUI
-        xc = x + self._radius * scaleUI
-        
         y = parent[1] + self._pos[1]
-        yo = y - self._radius * scaleUI
-        yc = y + self._radius * scaleUI
+        packer.handle(x * scale, y * scale, radius * scale, self._colour)
         
-        # Generate diamond data
-        vertices = ((xo * scale, yo * scale), (xc * scale, yo * scale),
-                    (xo * scale, yc * scale), (xc * scale, yc * scale))
-
-        indices = ((0, 1, 2), (2, 1, 3))
-
-        shader = gpu.shader.from_builtin('2D_UNIFORM_COLOR')
-        batch = batch_for_shader(shader, 'TRIS', {"pos": vertices}, indices=indices)
-
-        bgl.glEnable(bgl.GL_BLEND)
-        shader.bind()
-        shader.uniform_float("color", self._colour)
-        batch.draw(shader)
-        bgl.glDisable(bgl.GL_BLEND)
-
-        '''
-        # Generate diamond data
-        positions = [[x0, y], [x, y0], [x1, y], [x, y1]]
-        settings = [bgl.GL_QUADS, bgl.GL_LINE_LOOP]
-        
-        colour = self._colour
-        
-        # Render box
-        for mode in settings:
-            bgl.glEnable(bgl.GL_BLEND)
-            bgl.glBegin(mode)
-            bgl.glColor4f(colour[0], colour[1], colour[2], colour[3])
-            for x, y in positions:
-                bgl.glVertex2f(x * scale, y * scale)
-            bgl.glEnd()
-        '''
-            
-        super().draw(context, parent, scale)
+        super().pack(context, parent, scale, packer)
         
     @Util.Overrides(Interactable)
     def store(self, context, buffer):
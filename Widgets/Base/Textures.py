@@ -0,0 +1,203 @@
+import time
+import numpy
+
+####################################################################################
+
+# Cached full resolution textures by image name as (update counter, texture)
+_textures = {}
+
+# Downscaled proxies by image name as (update counter, levels), levels are [width, height, pixels, texture], pixels are dropped once uploaded
+_proxies = {}
+
+# Images whose full resolution data was loaded by us and nobody else needs
+_loaded = set()
+
+# Update counters by image name, bumped whenever image data changes
+_updates = {}
+
+# Smallest proxy side length
+_minProxy = 64
+
+# Seconds proxies of an image that keeps changing (e.g. while painted) are kept before rebuilding them again
+_rebuildInterval = 0.5
+
+# Time proxies were last built at by image name
+_builtAt = {}
+
+####################################################################################
+
+# Gets an image by name, None if there is none. Blender is only imported once an image is needed
+def getImage(name):
+    import bpy
+    return bpy.data.images.get(name)
+
+# Reports changed image data, its textures get recreated on next use
+def refresh(name):
+    _updates[name] = _updates.get(name, 0) + 1
+
+# Checks whether an image can be drawn
+def hasImage(name):
+    
+    if not name:
+        return False
+    
+    if name in _proxies:
+        return True
+    
+    # Images from disk get loaded on first draw
+    image = getImage(name)
+    return image is not None and (image.has_data or image.source == 'FILE')
+
+# Gets texture format matching how Blender would upload the image
+def getFormat(image):
+    
+    if image.is_float:
+        return 'RGBA16F'
+    if image.colorspace_settings.name == 'sRGB':
+        return 'SRGB8_A8'
+    return 'RGBA8'
+
+# Builds downscaled pixel buffers of an image by halving until too small
+def buildProxies(name):
+    
+    image = getImage(name)
+    if image is None:
+        _proxies.pop(name, None)
+        return False
+    
+    # Reading the size loads the image, only data loaded here is ours to free
+    loaded = not image.has_data
+    width, height = image.size
+    if width == 0 or height == 0:
+        _proxies.pop(name, None)
+        return False
+    if loaded:
+        _loaded.add(name)
+    
+    # Read all pixels at once
+    pixels = numpy.empty(width * height * 4, dtype=numpy.float32)
+    image.pixels.foreach_get(pixels)
+    pixels = pixels.reshape(height, width, 4)
+    
+    # Average 2x2 blocks per level
+    levels = []
+    while width // 2 >= _minProxy and height // 2 >= _minProxy:
+        width //= 2
+        height //= 2
+        pixels = pixels[:height * 2, :width * 2].reshape(height, 2, width, 2, 4).mean(axis=(1, 3))
+        levels.append([width, height, numpy.ascontiguousarray(pixels, dtype=numpy.float32), None])
+    
+    # Smallest first
+    levels.reverse()
+    _proxies[name] = (_updates.get(name, 0), levels)
+    _builtAt[name] = time.monotonic()
+    return True
+
+# Checks whether proxies of an image were built too recently to rebuild them already
+def isThrottled(name):
+    return name in _builtAt and time.monotonic() - _builtAt[name] < _rebuildInterval
+
+# Gets images whose drawn proxies are outdated with seconds until they may be rebuilt
+def getOutdated():
+    
+    now = time.monotonic()
+    return {name: max(_builtAt.get(name, now) + _rebuildInterval - now, 0.0)
+            for name, entry in _proxies.items() if entry[0] != _updates.get(name, 0)}
+
+# Gets full resolution texture for an image by name, None if the image isn't available
+def getTexture(name):
+    
+    if not name:
+        return None
+    
+    # Reuse texture if image didn't change since
+    counter = _updates.get(name, 0)
+    entry = _textures.get(name)
+    if entry and entry[0] == counter:
+        return entry[1]
+    
+    image = getImage(name)
+    if image is None:
+        _textures.pop(name, None)
+        return None
+    
+    # Reading the size loads the image, only data loaded here is ours to free
+    loaded = not image.has_data
+    if 0 in tuple(image.size):
+        _textures.pop(name, None)
+        return None
+    if loaded:
+        _loaded.add(name)
+    
+    # Only uploads need the GPU, lookups stay usable without it
+    import gpu
+    texture = gpu.texture.from_image(image)
+    _textures[name] = (counter, texture)
+    return texture
+
+# Gets smallest proxy texture covering the given on-screen size, full resolution if none does
+def getProxy(name, width, height):
+    
+    if not name:
+        return None
+    
+    # Rebuild proxies if image changed since, keep drawing the old ones while it keeps changing
+    entry = _proxies.get(name)
+    if not entry or (entry[0] != _updates.get(name, 0) and not isThrottled(name)):
+        if not buildProxies(name):
+            return getTexture(name)
+        entry = _proxies[name]
+    
+    for level in entry[1]:
+        if level[0] >= width and level[1] >= height:
+            
+            # Full resolution data isn't needed anymore
+            release(name)
+            
+            if level[3] is None:
+                
+                # Image may have been removed since the proxies were built
+                image = getImage(name)
+                if image is None:
+                    _proxies.pop(name, None)
+                    return None
+                
+                # Pixels aren't needed anymore once uploaded
+                import gpu
+                data = gpu.types.Buffer('FLOAT', level[0] * level[1] * 4, level[2].ravel())
+                level[3] = gpu.types.GPUTexture((level[0], level[1]), format=getFormat(image), data=data)
+                level[2] = None
+            return level[3]
+    
+    return getTexture(name)
+
+# Frees full resolution texture and pixel data of an image, proxies stay
+def release(name):
+    
+    _textures.pop(name, None)
+    if name in _loaded:
+        _loaded.discard(name)
+        
+        # Never throw away edits or pixels that can't be read from disk again
+        image = getImage(name)
+        if image is not None and image.source == 'FILE' and not image.packed_file and not image.is_dirty:
+            image.buffers_free()
+
+# Drops textures and proxies of images not in use anymore
+def evict(names):
+    
+    for name in [name for name in _textures if name not in names]:
+        del _textures[name]
+    for name in [name for name in _proxies if name not in names]:
+        del _proxies[name]
+        _builtAt.pop(name, None)
+    _loaded.intersection_update(names)
+
+# Drops all cached textures
+def unregister():
+    
+    _textures.clear()
+    _proxies.clear()
+    _loaded.clear()
+    _updates.clear()
+    _builtAt.clear()
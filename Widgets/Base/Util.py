@@ -1,5 +1,3 @@
-import bpy
-
 # Override Decorator
 def Overrides(interface_class):
     def overrider(method):
@@ -19,10 +17,10 @@ def roundTowards(x, a=0.5, step=1.0):
     return x - f if f < a * step else x + step - f
 
 # Checks if grid is active and adapts to it
-def adaptToGrid(pos, active):
+def adaptToGrid(context, pos, active):
 
     # See if grid is active
-    grid = bpy.context.scene.enableRigSelector.grid
+    grid = context.scene.enableRigSelector.grid
     if active and grid > 0.0:
         x = roundTowards(pos[0], 0.5, grid)
         y = roundTowards(pos[1], 0.5, grid)
@@ -38,4 +36,83 @@ _interfaces = []
 _selectedSelector = None
 
 # Currently selected selector
-_selectedInterface = None
\ No newline at end of file
+_selectedInterface = None
+
+# Selector under the cursor
+_hoveredSelector = None
+
+# Viewport needs to be redrawn
+_redraw = False
+
+# Visible area in draw coordinates (xmin, ymin, xmax, ymax), None to draw everything
+_clip = None
+
+# Level of detail thresholds, on-screen selector size in pixels below which
+# outlines are dropped, shapes packed as coarse box and link colours skipped
+_lodOutline = 10.0
+_lodCoarse = 5.0
+_lodColour = 2.0
+
+####################################################################################
+
+# Requests a viewport redraw
+def requestRedraw():
+    global _redraw
+    _redraw = True
+
+# Tags all 3D views for redraw only if anything requested it since the last call
+def flushRedraw(context):
+    global _redraw
+    
+    if _redraw and context.window_manager:
+        for window in context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == 'VIEW_3D':
+                    area.tag_redraw()
+        _redraw = False
+
+# Gets pointers of all 3D view regions currently on screen
+def getViewRegions(context):
+    
+    regions = set()
+    if context.window_manager:
+        for window in context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == 'VIEW_3D':
+                    for region in area.regions:
+                        if region.type == 'WINDOW':
+                            regions.add(region.as_pointer())
+    return regions
+
+# Changes selected selector, redraws both old and new selection
+def selectSelector(selector):
+    global _selectedSelector
+    
+    if not selector is _selectedSelector:
+        if _selectedSelector:
+            _selectedSelector.invalidate()
+        if selector:
+            selector.invalidate()
+        _selectedSelector = selector
+
+# Changes hovered selector, returns whether it changed. Hover is drawn on top of the caches so they stay valid
+def hoverSelector(selector):
+    global _hoveredSelector
+    
+    if selector is _hoveredSelector:
+        return False
+    
+    _hoveredSelector = selector
+    requestRedraw()
+    return True
+
+# Changes selected interface, redraws both old and new selection
+def selectInterface(interface):
+    global _selectedInterface
+    
+    if not interface is _selectedInterface:
+        if _selectedInterface:
+            _selectedInterface.invalidate()
+        if interface:
+            interface.invalidate()
+        _selectedInterface = interface
@@ -1,9 +1,3 @@
-import bpy
-
-import gpu
-import bgl
-from gpu_extras.batch import batch_for_shader
-
 from .Base import Symbols
 from .Base import Util
 
@@ -20,6 +14,9 @@ class Vertex(Symbols.Circle):
     # Update callback
     _index = -1
     
+    # Selected for group editing
+    _selected = False
+    
     # Constructor
     def __init__(self, pos, radius, index, callback):
         super().__init__(pos, radius)
@@ -41,6 +38,20 @@ class Vertex(Symbols.Circle):
         if self._update:
             self._update(context, self)
     
+    @Util.Overrides(Symbols.Interactable)
+    def moved(self):
+        
+        # Moving a vertex changes the shape it belongs to
+        self.reshape()
+    
+    # Marks this vertex as selected for group editing
+    def setSelected(self, selected):
+        
+        if selected != self._selected:
+            self._selected = selected
+            self._colour = (1.0, 0.6, 0.2, 0.9) if selected else (0.4, 0.4, 0.4, 0.9)
+            self.invalidate()
+    
     @Util.Overrides(Symbols.Interactable)
     def store(self, context, buffer):
         
@@ -89,12 +100,12 @@ class Median(Symbols.Rectangle):
         self._container.addVertex(context, (x, y))
     
     @Util.Overrides(Symbols.Rectangle)
-    def draw(self, context, parent, scale):
+    def pack(self, context, parent, scale, packer):
     
-        symmetry = bpy.context.scene.enableRigSelector.symmetry
+        symmetry = context.scene.enableRigSelector.symmetry
         self._colour = (0.0, 0.0, 0.0, 0.5) if symmetry else (0.0, 0.0, 0.0, 0.0)
             
-        super().draw(context, parent, scale)
+        super().pack(context, parent, scale, packer)
         
     
     # Update visibility depending on whether any buttons are visible
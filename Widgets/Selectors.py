@@ -1,11 +1,8 @@
-import bpy
-
-import gpu
-import bgl
-from gpu_extras.batch import batch_for_shader
+import numpy
 
 from .Base import Symbols
 from .Base import Util
+from .Base import Profiler
 from . import Elements
 
 ####################################################################################
@@ -29,6 +26,32 @@ class Selector(Symbols.Interactable):
     
     # Shape colour
     _default = (0.0, 0.0, 0.0, 1.0)
+    
+    # Cached bounding box of all vertices (xmin, ymin, xmax, ymax)
+    _bounds = None
+    
+    # Cached local vertex positions as (n, 2) array
+    _local = None
+    
+    # Cached polygon winding sign (cross product of the first three vertices)
+    _winding = None
+    
+    # Triangle fan (m, 3) and closed outline (n, 2) vertex indices
+    _triangles = None
+    _edges = None
+    
+    # Vertex index of each packed corner, fan triangles first then six outline quad corners per edge
+    _packIndices = None
+    
+    # Offset of each packed corner from its vertex for a one pixel outline, rebuilt with local positions
+    _packOffsets = None
+    
+    # Packed (positions, colours) chunks and the placement and style they were packed with
+    _packed = None
+    _packedKey = None
+    
+    # Link state seen at the last scene update
+    _signature = None
                 
     # Constructor
     def __init__(self, pos, colour):
@@ -71,10 +94,25 @@ class Selector(Symbols.Interactable):
     def updateLink(self, context):
         pass
     
+    # Gets (object name, bone name) for batched selection, None if this link can't be selected that way
+    def getLinkTarget(self, context):
+        return None
+    
     # Get link colour
     def getLinkColour(self, context):
         return((0.0, 0.0, 0.0, 1.0))
     
+    # Checks if link uses any of the given object or data names
+    def isLinkedTo(self, context, names):
+        return(False)
+    
+    # Gets everything about the link that shows in the picker
+    def getLinkSignature(self, context):
+        
+        linked = self.isLinked(context)
+        return (linked, linked and self.isLinkVisible(context), self.isLinkSelected(context),
+                self.getLinkColour(context) if linked else None)
+    
     # Gets twin from stored twin index
     def getTwin(self):
         
@@ -91,8 +129,13 @@ class Selector(Symbols.Interactable):
         if num <= 2:
             return False
         
+        # Reject most misses by bounding box
+        xo, yo, xc, yc = self.getBounds()
+        if pos[0] < xo or pos[0] > xc or pos[1] < yo or pos[1] > yc:
+            return False
+        
         # Get general direction
-        dir = self.cross(self._vertices[0]._pos, self._vertices[1]._pos, self._vertices[2]._pos)
+        dir = self.getWinding()
         for index in range(0, num):
             
             # Check if always on the same side
@@ -106,13 +149,91 @@ class Selector(Symbols.Interactable):
     def isGrabZone(self, context, pos):
         return self._edit
     
+    @Util.Overrides(Symbols.Interactable)
+    def reshape(self):
+        self._bounds = None
+        self._local = None
+        self._winding = None
+        self._packOffsets = None
+        self._packedKey = None
+        if self._parent:
+            self._parent.reindex(self)
+        super().reshape()
     
     @Util.Overrides(Symbols.Interactable)
-    def draw(self, context, parent, scale):
-                           
-        # Compute position
+    def moved(self):
+        if self._parent:
+            self._parent.reindex(self)
+        super().moved()
+    
+    # Rebuilds triangulation and outline after vertices were added, removed or moved
+    def updateGeometry(self):
+        
+        num = len(self._vertices)
+        self._triangles = numpy.array([(0, i, i + 1) for i in range(1, num - 1)], dtype=numpy.int32).reshape(-1, 3)
+        self._edges = numpy.array([(i - 1 if i > 0 else num - 1, i) for i in range(0, num)], dtype=numpy.int32).reshape(-1, 2)
+        
+        # Outline quads in the same corner order as Packer.lines
+        self._packIndices = numpy.concatenate((self._triangles.reshape(-1), self._edges[:, (0, 0, 1, 1, 0, 1)].reshape(-1)))
+        self.reshape()
+    
+    # Gets local vertex positions, rebuilt only after a shape change
+    def getLocal(self):
+        
+        if self._local is None:
+            self._local = numpy.array([vertex._pos for vertex in self._vertices], dtype=numpy.float32).reshape(-1, 2)
+        return self._local
+    
+    # Gets offsets of packed corners, zero for the fill and half a pixel along the edge normal for the outline
+    def getPackOffsets(self):
+        
+        if self._packOffsets is None:
+            local = self.getLocal()
+            diff = local[self._edges[:, 1]] - local[self._edges[:, 0]]
+            length = numpy.maximum(numpy.hypot(diff[:, 0], diff[:, 1]), 1e-6)
+            normals = numpy.stack((-diff[:, 1], diff[:, 0]), axis=1) / (length[:, None] * 2)
+            signs = numpy.array((1.0, -1.0, 1.0, 1.0, -1.0, -1.0), dtype=numpy.float32)
+            
+            self._packOffsets = numpy.zeros((len(self._packIndices), 2), dtype=numpy.float32)
+            self._packOffsets[len(self._triangles) * 3:] = (normals[:, None, :] * signs[None, :, None]).reshape(-1, 2)
+        return self._packOffsets
+    
+    # Gets polygon winding, only valid with at least three vertices
+    def getWinding(self):
+        
+        if self._winding is None:
+            self._winding = self.cross(self._vertices[0]._pos, self._vertices[1]._pos, self._vertices[2]._pos)
+        return self._winding
+    
+    # Gets bounding box of all vertices relative to this selector
+    def getBounds(self):
+        
+        if self._bounds is None:
+            local = self.getLocal()
+            low = local.min(axis=0)
+            high = local.max(axis=0)
+            self._bounds = (float(low[0]), float(low[1]), float(high[0]), float(high[1]))
+        return self._bounds
+    
+    @Util.Overrides(Symbols.Interactable)
+    def isCulled(self, context, parent):
+        
+        clip = Util._clip
+        if clip is None or not self._vertices:
+            return False
+        
+        # Leave room for outline and vertex handles
+        pad = 8.0 * context.scene.enableRigSelector.scaleUI if self._edit else 1.0
+        
         x = parent[0] + self._pos[0]
         y = parent[1] + self._pos[1]
+        bounds = self.getBounds()
+        return (x + bounds[2] + pad < clip[0] or x + bounds[0] - pad > clip[2] or
+                y + bounds[3] + pad < clip[1] or y + bounds[1] - pad > clip[3])
+    
+    
+    # Computes fill and border colour, adapts link of the selected selector, skips link colour lookup if not needed
+    def getStyle(self, context, lookup = True):
         
         # Cache twin
         twin = self.getTwin()
@@ -142,58 +263,77 @@ class Selector(Symbols.Interactable):
             colour = self._default
             
             # Adapt link colour if available
-            if self.isLinked(context):
+            if lookup and self.isLinked(context):
                 colour = self.getLinkColour(context)
         
-        # Generate vertex data
-        positions = []
-        for vertex in self._vertices:
-            positions.append((x + vertex._pos[0], y + vertex._pos[1]))
-        
         # Generate settings
         border = (1.0, 1.0, 1.0, alpha) if selected else colour
         colour = (colour[0], colour[1], colour[2], colour[3] * alpha)
-
-        # Generate vertex data
-        positions = [(x + vertex._pos[0], y + vertex._pos[1]) for vertex in self._vertices]
-        vertices = [(px * scale, py * scale) for px,py in positions]
-        last = len(vertices)
-        origin = (  sum([vx for vx, vy in vertices]) / last, 
-                    sum([vy for vx, vy in vertices]) / last)
-        vertices.append(origin)
-        indices = [(i, (i+1)%last, last) for i in range(0, last)]
-        edges = [(i, (i+1)%last) for i in range(0, last)]
-        
-        for mode, idx, col in [('TRIS', indices, colour), ('LINES', edges, border)]:
-
-            shader = gpu.shader.from_builtin('2D_UNIFORM_COLOR')
-            batch = batch_for_shader(shader, mode, {"pos": vertices}, indices=idx)
-
-            bgl.glEnable(bgl.GL_BLEND)
-            shader.bind()
-            shader.uniform_float("color", col)
-            batch.draw(shader)
-            bgl.glDisable(bgl.GL_BLEND)
-
-        '''
-        # Generate settings
-        border = (1.0, 1.0, 1.0, 1.0) if selected else colour
-        settings = [(bgl.GL_LINE_LOOP, border, 1.0), (bgl.GL_POLYGON, colour, alpha)]
-        
-        # Render box
-        for mode, col, coeff in settings:
-            bgl.glEnable(bgl.GL_BLEND)
-            bgl.glBegin(mode)
-            bgl.glColor4f(col[0], col[1], col[2], col[3] * coeff)
-            for x, y in positions:
-                bgl.glVertex2f(x * scale, y * scale)
-            bgl.glEnd()
-        '''
-            
-        # Only draw vertices (children) when editing or building
+        
+        return (colour, border)
+    
+    @Util.Overrides(Symbols.Interactable)
+    @Profiler.timed("Selector")
+    def pack(self, context, parent, scale, packer):
+        
+        # Compute position
+        x = parent[0] + self._pos[0]
+        y = parent[1] + self._pos[1]
+        
+        # Get on-screen size for level of detail, selected selector is always fully detailed
+        bounds = self.getBounds()
+        size = max(bounds[2] - bounds[0], bounds[3] - bounds[1]) * scale
+        if Util._selectedSelector == self:
+            size = float("inf")
+        
+        # Get fill and border colour
+        colour, border = self.getStyle(context, size >= Util._lodColour)
+        Profiler.count("selectors")
+        
+        # Repack only if placement, shape, style or detail changed
+        coarse = size < Util._lodCoarse
+        outline = not coarse and size >= Util._lodOutline
+        key = (x, y, scale, colour, border, outline, coarse)
+        if key != self._packedKey:
+            
+            if coarse:
+                
+                # Coarse box instead of shape
+                xo, yo = (x + bounds[0]) * scale, (y + bounds[1]) * scale
+                xc, yc = (x + bounds[2]) * scale, (y + bounds[3]) * scale
+                corners = numpy.array(((xo, yo), (xc, yo), (xo, yc), (xo, yc), (xc, yo), (xc, yc)), dtype=numpy.float32)
+                colours = numpy.empty((6, 4), dtype=numpy.float32)
+                colours[:] = colour
+                self._packed = [(corners, colours)]
+            
+            else:
+                
+                # All corners in one pass from precomputed topology
+                corners = (self.getLocal()[self._packIndices] + numpy.array((x, y), dtype=numpy.float32)) * numpy.float32(scale) + self.getPackOffsets()
+                colours = numpy.empty((len(corners), 4), dtype=numpy.float32)
+                fill = len(self._triangles) * 3
+                colours[:fill] = colour
+                colours[fill:] = border
+                
+                self._packed = [(corners[:fill], colours[:fill])]
+                if outline:
+                    self._packed.append((corners[fill:], colours[fill:]))
+            self._packedKey = key
+        
+        for positions, colours in self._packed:
+            packer.chunk(positions, colours)
+        if coarse:
+            Profiler.count("coarse")
+        
+        # Only pack vertices (children) when editing or building, handles stay grabbable at any size
         if self._edit:
-            super().draw(context, parent, scale)
+            super().pack(context, parent, scale, packer)
     
+    # Gets lightened link colour the hover outline is drawn with
+    def getHoverColour(self, context):
+        
+        colour = self.getLinkColour(context) if self.isLinked(context) else self._default
+        return ((colour[0] + 1.0) / 2, (colour[1] + 1.0) / 2, (colour[2] + 1.0) / 2, 1.0)
     
     @Util.Overrides(Symbols.Interactable)
     def clicked(self, context, pos, right, shift):
@@ -203,7 +343,7 @@ class Selector(Symbols.Interactable):
             Util._selectedSelector.finish(context)
         
         # Select this selector
-        Util._selectedSelector = self
+        Util.selectSelector(self)
         
         if self._build:
             
@@ -221,7 +361,7 @@ class Selector(Symbols.Interactable):
     def dropped(self, context, pos):
         
         # Adapt to grid
-        pos = Util.adaptToGrid(pos, self._grid)
+        pos = Util.adaptToGrid(context, pos, self._grid)
         
         # Select this selector
         self.clicked(context, (0,0), False, False)
@@ -239,6 +379,7 @@ class Selector(Symbols.Interactable):
         # Move twin
         if twin and self._parent:
             twin._pos = (-self._pos[0], self._pos[1])
+            twin.moved()
         
         # Get bounds
         if self._parent:
@@ -489,7 +630,7 @@ class Selector(Symbols.Interactable):
     def addVertex(self, context, pos):    
         
         # Adapt to grid
-        pos = Util.adaptToGrid(pos, self._grid)
+        pos = Util.adaptToGrid(context, pos, self._grid)
         
         # See if added vertex is on other side of median
         symmetry = context.scene.enableRigSelector.symmetry
@@ -618,6 +759,9 @@ class Selector(Symbols.Interactable):
             after = self._vertices[i]
             median._pos = ((before._pos[0] + after._pos[0]) / 2, (before._pos[1] + after._pos[1]) / 2)
             median._active = median._visible = self._edit
+        
+        # Vertices changed, rebuild geometry
+        self.updateGeometry()
     
     
     # Add new vertex if median moves
@@ -773,6 +917,7 @@ class BoneSelector(Selector):
     
     @Util.Overrides(Selector)
     def selectLink(self, context):
+        import bpy
         
         # Find linked object
         obj = context.scene.objects.get(self._object)
@@ -811,16 +956,14 @@ class BoneSelector(Selector):
     
     @Util.Overrides(Selector)
     def deselectAll(self, context):
+        deselectLinks(context)
+    
+    @Util.Overrides(Selector)
+    def getLinkTarget(self, context):
         
-        # Deselect all pose bones
-        if not context.selected_objects is None :
-            for obj in context.selected_objects :
-                obj.select_set(False)
-        
-        # Deselect all pose bones
-        if not context.selected_pose_bones is None :
-            for bone in context.selected_pose_bones :
-                bone.bone.select = False
+        if self._linked and self._object:
+            return (self._object, self._bone)
+        return None
             
     
     @Util.Overrides(Selector)
@@ -867,6 +1010,14 @@ class BoneSelector(Selector):
         return self._default
             
     
+    @Util.Overrides(Selector)
+    def isLinkedTo(self, context, names):
+        
+        obj = context.scene.objects.get(self._object)
+        if self._linked and obj:
+            return obj.name in names or (obj.data and obj.data.name in names)
+        return False
+    
     # Gets linked to bone
     def getLinkedBone(self, context):
         
@@ -914,6 +1065,69 @@ class BoneSelector(Selector):
 
 ####################################################################################
 
+# Deselects all objects and pose bones
+def deselectLinks(context):
+    
+    # Deselect all objects
+    if not context.selected_objects is None :
+        for obj in context.selected_objects :
+            obj.select_set(False)
+    
+    # Deselect all pose bones
+    if not context.selected_pose_bones is None :
+        for bone in context.selected_pose_bones :
+            bone.bone.select = False
+
+# Selects links of many selectors at once with at most one mode switch, returns whether anything got selected
+def selectLinks(context, selectors, extend):
+    import bpy
+    
+    # Group bones by armature, skip hidden objects
+    armatures = {}
+    objects = []
+    for selector in selectors:
+        target = selector.getLinkTarget(context)
+        if target:
+            obj = context.scene.objects.get(target[0])
+            if obj and obj.visible_get():
+                if obj.type == 'ARMATURE' and target[1]:
+                    armatures.setdefault(obj, []).append(target[1])
+                elif obj not in objects:
+                    objects.append(obj)
+    
+    if not armatures and not objects:
+        return False
+    
+    if not extend:
+        deselectLinks(context)
+    
+    for obj in objects:
+        obj.select_set(True)
+    
+    if armatures:
+        
+        # All selected armatures enter pose mode together with the active one
+        for armature in armatures:
+            armature.select_set(True)
+        active = next(iter(armatures))
+        context.view_layer.objects.active = active
+        if active.mode != 'POSE':
+            bpy.ops.object.mode_set(mode='POSE')
+        
+        for armature, names in armatures.items():
+            for name in names:
+                bone = armature.data.bones.get(name)
+                if bone:
+                    bone.select = True
+                    if armature == active:
+                        armature.data.bones.active = bone
+    else:
+        context.view_layer.objects.active = objects[-1]
+    
+    return True
+
+####################################################################################
+
 class LayerSelector(Selector):
     """Layer selector button element"""
     
@@ -997,6 +1211,14 @@ class LayerSelector(Selector):
     def getLinkColour(self, context):
         return self._default
         
+    @Util.Overrides(Selector)
+    def isLinkedTo(self, context, names):
+        
+        armature = self.getLinked(context)
+        if armature:
+            return armature.name in names or armature.data.name in names
+        return False
+    
     # Gets linked to armature
     def getLinked(self, context):
         
@@ -1,11 +1,13 @@
-import bpy
-
-import gpu
-import bgl
-from gpu_extras.batch import batch_for_shader
+import math
+import numpy
 
 from .Base import Symbols
 from .Base import Util
+from .Base import Packer
+from .Base import Commands
+from .Base import Textures
+from .Base import Polygons
+from .Base import Profiler
 from . import Elements
 from . import Selectors
 
@@ -17,9 +19,6 @@ class Interface(Symbols.Rectangle):
     # Corners for resize
     _corners = []
     
-    # Background image name
-    _background = ""
-    
     # Median
     _median = None
     _medianVertex = None
@@ -29,6 +28,23 @@ class Interface(Symbols.Rectangle):
     
     # Edit state
     _edit = False
+    
+    # Packs this interface into its draw list
+    _packer = None
+    _drawList = None
+    
+    # Backend cache, the settings it was drawn with and whether anything is on it
+    _cache = None
+    _cacheKey = None
+    _dirty = True
+    _shown = False
+    _margin = 0.0
+    
+    # Placement per region pointer as (layout key, clamped position or None if off-screen, clip)
+    _regions = {}
+    
+    # Placement the draw list was recorded for when drawing without cache
+    _directKey = None
         
     # Constructor
     def __init__(self, pos, size):
@@ -36,6 +52,9 @@ class Interface(Symbols.Rectangle):
         self._active = True
         self._colour = (0.1, 0.1, 0.1, 0.2)
         self._corners = []
+        self._packer = Packer.Packer()
+        self._drawList = Commands.DrawList()
+        self._regions = {}
         
         self._median = self.addChild(Elements.Median())
     
@@ -64,11 +83,8 @@ class Interface(Symbols.Rectangle):
         # Add Vertex
         self._median.addVertex(context, pos)
     
-    @Util.Overrides(Symbols.Rectangle)
-    def draw(self, context, parent, scale):
-        
-        # Make sure interface is inside screen
-        self.dropped(context, (0.0, 0.0))
+    # Updates layout and colours ahead of drawing, returns whether anything is visible
+    def prepare(self, context):
         
         # Set correct median position
         self._median._container._pos = (0.0, self._size[1] * self._heightRatio)
@@ -90,13 +106,281 @@ class Interface(Symbols.Rectangle):
             else:
                 self._colour = (0.1, 0.1, 0.1, 0.8 * setting)
         
-        # Get background image
-        if self._background and self._background in bpy.data.images:
-            self._image = bpy.data.images[self._background]
-        
         # Only draw background if any buttons are active
-        if self._median.updateVisibility(context):
-            super().draw(context, parent, scale)
+        return self._median.updateVisibility(context)
+    
+    # Records this interface into a draw list, returns whether anything is visible
+    @Profiler.timed("Interface")
+    def record(self, context, parent, scale, drawList):
+        
+        visible = self.prepare(context)
+        if visible:
+            self._packer.begin(drawList, context.scene.enableRigSelector.batching)
+            self.pack(context, parent, scale, self._packer)
+            self._packer.finish()
+        return visible
+    
+    @Util.Overrides(Symbols.Interactable)
+    def invalidate(self):
+        
+        # Redraw offscreen cache
+        self._dirty = True
+        Util.requestRedraw()
+    
+    @Util.Overrides(Symbols.Interactable)
+    def moved(self):
+        
+        # Only the composited quad moves, offscreen cache stays valid
+        Util.requestRedraw()
+    
+    # Frees offscreen cache
+    def free(self):
+        
+        if self._cache:
+            self._cache.free()
+        self._cache = None
+        self._regions = {}
+        self._dirty = True
+    
+    # Draws this interface from its offscreen cache, redraws the cache only if needed
+    def composite(self, context, scale, backend):
+        
+        # Skip entirely if off-screen in this region
+        pos, clip = self.getPlacement(context, scale)
+        if pos is None:
+            return
+        
+        # Cache is shared by all regions showing this interface, only clip it to the visible part if there is just one
+        if len(self._regions) > 1:
+            self.pruneRegions(context)
+            if sum(1 for entry in self._regions.values() if entry[1] is not None) > 1:
+                clip = None
+        
+        # Settings changes need a redraw too
+        settings = context.scene.enableRigSelector
+        key = (tuple(self._size), scale, settings.alpha, settings.grid, settings.scaleUI, settings.symmetry,
+                settings.batching, self._edit, Util._selectedInterface == self, clip)
+        if key != self._cacheKey:
+            self._cacheKey = key
+            self._dirty = True
+        
+        Profiler.count("interfaces")
+        
+        # Too big for a texture, draw straight into the region instead
+        width, height = self.getCacheSize(context, scale)
+        if max(width, height) > backend.getMaxSize():
+            self.drawDirect(context, pos, scale, backend)
+            self.drawHover(context, (pos[0] * scale, pos[1] * scale), scale, backend)
+            return
+        
+        if self._dirty:
+            Util._clip = clip
+            self._shown = self.renderCache(context, scale, backend)
+            Util._clip = None
+            self._dirty = False
+        
+        if self._shown:
+            
+            # Snap to whole pixels so texels map 1:1 to the screen
+            xo = math.floor((pos[0] - self._margin) * scale)
+            yo = math.floor((pos[1] - self._margin) * scale)
+            backend.drawCache(self._cache, xo, yo)
+            self.drawHover(context, (xo + self._margin * scale, yo + self._margin * scale), scale, backend)
+    
+    # Draws outline of the hovered selector on top of this interface given the interface origin in region pixels
+    def drawHover(self, context, origin, scale, backend):
+        
+        selector = Util._hoveredSelector
+        container = self._median._container
+        if not self._shown or selector is None or selector._parent != container or not selector._visible:
+            return
+        
+        x = origin[0] + (self._median._pos[0] + container._pos[0] + selector._pos[0]) * scale
+        y = origin[1] + (self._median._pos[1] + container._pos[1] + selector._pos[1]) * scale
+        outline = [(x + vertex._pos[0] * scale, y + vertex._pos[1] * scale) for vertex in selector._vertices]
+        
+        drawList = Commands.DrawList()
+        packer = Packer.Packer()
+        packer.begin(drawList)
+        packer.outline(outline, selector.getHoverColour(context))
+        packer.finish()
+        backend.execute(drawList)
+    
+    # Draws this interface without cache, only records again if anything changed
+    def drawDirect(self, context, pos, scale, backend):
+        
+        region = context.region
+        key = (self._cacheKey, tuple(pos), region.width, region.height)
+        if self._dirty or key != self._directKey:
+            
+            # Drop texture from when it still fit
+            if self._cache:
+                self._cache.free()
+                self._cache = None
+            
+            # Draw at the placement in this region, cull to the region
+            Util._clip = (0.0, 0.0, region.width / scale, region.height / scale)
+            self._drawList.clear()
+            self._shown = self.record(context, (pos[0] - self._pos[0], pos[1] - self._pos[1]), scale, self._drawList)
+            Util._clip = None
+            
+            self._directKey = key
+            self._dirty = False
+        
+        if self._shown:
+            backend.execute(self._drawList)
+    
+    # Gets position clamped to the current region and visible part (in offscreen coordinates), cached per region
+    def getPlacement(self, context, scale):
+        
+        region = context.region
+        clamp = context.scene.enableRigSelector.clamp
+        margin = self.getMargin(context)
+        
+        # Reuse placement until region or layout changes
+        key = (tuple(self._pos), tuple(self._size), region.width, region.height, scale, margin, clamp)
+        entry = self._regions.get(region.as_pointer())
+        if entry and entry[0] == key:
+            return (entry[1], entry[2])
+        
+        width = region.width / scale
+        height = region.height / scale
+        
+        # Make sure interface is inside region without moving it for other regions
+        x, y = self._pos
+        if clamp:
+            x = min(max(x, 0.0), width - self._size[0])
+            y = min(max(y, 0.0), height - self._size[1])
+        
+        # Get interface bounds
+        xo = x - margin
+        yo = y - margin
+        xc = x + self._size[0] + margin
+        yc = y + self._size[1] + margin
+        
+        pos = None
+        clip = None
+        if not (xc < 0.0 or xo > width or yc < 0.0 or yo > height):
+            pos = (x, y)
+            
+            # Only render visible part if partially off-screen
+            if xo < 0.0 or yo < 0.0 or xc > width or yc > height:
+                clip = (max(xo, 0.0) - xo, max(yo, 0.0) - yo, min(xc, width) - xo, min(yc, height) - yo)
+        
+        self._regions[region.as_pointer()] = (key, pos, clip)
+        return (pos, clip)
+    
+    # Forgets placements of regions that were closed, maximized or aren't on screen anymore
+    def pruneRegions(self, context):
+        
+        regions = Util.getViewRegions(context)
+        for pointer in [pointer for pointer in self._regions if pointer not in regions]:
+            del self._regions[pointer]
+    
+    # Gets how far this interface is shifted by clamping in the current region
+    def getRegionOffset(self, context):
+        
+        entry = self._regions.get(context.region.as_pointer())
+        if entry and entry[1]:
+            return (entry[1][0] - self._pos[0], entry[1][1] - self._pos[1])
+        return (0.0, 0.0)
+    
+    # Gets selector under the cursor, None if outside or nothing is shown
+    def hover(self, context, pos):
+        
+        # Get mouse offset
+        x = pos[0] - self._pos[0]
+        y = pos[1] - self._pos[1]
+        
+        if not self._shown or not self.isInside(context, (x, y)):
+            return None
+        
+        median = self._median
+        return median._container.hover(context, (x - median._pos[0], y - median._pos[1]))
+    
+    # Converts positions in the same space as press positions to container positions
+    def toContainer(self, points):
+        
+        container = self._median._container
+        x = self._pos[0] + self._median._pos[0] + container._pos[0]
+        y = self._pos[1] + self._median._pos[1] + container._pos[1]
+        return [(point[0] - x, point[1] - y) for point in points]
+    
+    # Gets selectors inside a lasso polygon given in the same space as press positions
+    def getSelectorsIn(self, context, lasso):
+        
+        if not self._shown:
+            return []
+        return self._median._container.getSelectorsIn(self.toContainer(lasso))
+    
+    # Gets selectors touched by a stroke given in the same space as press positions, in stroke order
+    def getSelectorsAlong(self, context, stroke):
+        
+        if not self._shown or not stroke:
+            return []
+        
+        # Sample stroke densely enough to not skip over small selectors
+        points = []
+        for a, b in zip(stroke, stroke[1:]):
+            steps = max(int(math.hypot(b[0] - a[0], b[1] - a[1]) / 2.0), 1)
+            points += [(a[0] + (b[0] - a[0]) * i / steps, a[1] + (b[1] - a[1]) * i / steps) for i in range(0, steps)]
+        points.append(stroke[-1])
+        
+        # All samples are tested in one query
+        found = []
+        for selector in self._median._container.getSelectorsAt(self.toContainer(points)):
+            if selector and selector not in found:
+                found.append(selector)
+        return found
+    
+    # Gets vertices inside a lasso polygon given in the same space as press positions
+    def getVerticesIn(self, context, lasso):
+        
+        if not self._shown:
+            return []
+        return self._median._container.getVerticesIn(self.toContainer(lasso))
+    
+    # Gets space around the interface needed for border and edit handles
+    def getMargin(self, context):
+        return 10.0 + 6.0 * context.scene.enableRigSelector.scaleUI
+    
+    # Gets offscreen cache size in pixels, covering interface and margin
+    def getCacheSize(self, context, scale):
+        
+        margin = self.getMargin(context)
+        width = int(math.ceil((self._size[0] + margin * 2) * scale))
+        height = int(math.ceil((self._size[1] + margin * 2) * scale))
+        return (width, height)
+    
+    # Renders this interface into its offscreen cache, returns whether anything is visible
+    def renderCache(self, context, scale, backend):
+        
+        margin = self.getMargin(context)
+        width, height = self.getCacheSize(context, scale)
+        
+        # Move interface origin into the margin
+        parent = (margin - self._pos[0], margin - self._pos[1])
+        
+        self._drawList.clear()
+        if not self.record(context, parent, scale, self._drawList):
+            return False
+        
+        self._cache = backend.renderCache(self._cache, width, height, self._drawList)
+        self._margin = margin
+        return True
+    
+    @Util.Overrides(Symbols.Rectangle)
+    def getImageTexture(self, scale):
+        
+        # Full resolution is only needed while editing
+        if self._edit:
+            return Textures.getTexture(self._image)
+        return super().getImageTexture(scale)
+    
+    # Checks whether updates of the given object or data names change how this interface looks, checks all links if everything changed
+    def updateLinks(self, context, names, everything):
+        changed = self._median._container.updateLinks(context, None if everything else names)
+        return changed or self._image in names
     
     # Enable or disable edit mode
     def toggleEdit(self, context, active):
@@ -226,7 +510,7 @@ class Interface(Symbols.Rectangle):
         
         buffer.write("width", self._medianRatio)
         buffer.write("height", self._heightRatio)
-        buffer.write("background", self._background)
+        buffer.write("background", self._image)
         
         sub = buffer.sub("median")
         self._median.store(context, sub)
@@ -238,11 +522,9 @@ class Interface(Symbols.Rectangle):
         
         self._medianRatio = buffer.read("width", float, 0.5)
         self._heightRatio = buffer.read("height", float, 0.5)
-        self._background = buffer.read("background", str, "")
-        if self._background and self._background in bpy.data.images:
-            self._image = bpy.data.images[self._background]
-            if self._image.has_data:
-                self._image.update()
+        self._image = buffer.read("background", str, "")
+        if self._image:
+            Textures.buildProxies(self._image)
                 
         sub = buffer.sub("median")
         self._median.load(context, sub)
@@ -265,10 +547,334 @@ class Container(Symbols.Interactable):
     # Stored selectors
     _default = (0.9, 0.7, 0.7, 0.9)
     
+    # Cached grid lines and the layout they were built for
+    _gridKey = None
+    _gridLines = None
+    
+    # Spatial index, children by grid cell, cells covered by each child and children whose cells are outdated
+    _cells = {}
+    _covers = {}
+    _stale = set()
+    
+    # Spatial index cell size
+    _cellSize = 32.0
+    
+    # Increasing number per child in child order, and the number for the next child
+    _order = {}
+    _nextOrder = 0
+    
+    # Packed selector polygons for batch hit tests, None if outdated
+    _polygons = None
+    
+    # Last hovered selector and the box it stays valid in (xmin, ymin, xmax, ymax), None if outdated
+    _hover = None
+    _hoverBox = None
+    
+    # Vertices selected for group editing
+    _selectedVertices = []
+    
+    # Container positions of selected vertices when the current transform started, None outside of transforms
+    _transformOrigin = None
+    
     # Constructor
     def __init__(self):
         super().__init__((0.0, 0.0))
         self._selectors = []
+        self._cells = {}
+        self._covers = {}
+        self._stale = set()
+        self._selectedVertices = []
+        self._order = {}
+        
+    @Util.Overrides(Symbols.Interactable)
+    def addChild(self, child):
+        if child not in self._order:
+            self._order[child] = self._nextOrder
+            self._nextOrder += 1
+        self._stale.add(child)
+        self._polygons = None
+        self._hoverBox = None
+        return super().addChild(child)
+    
+    @Util.Overrides(Symbols.Interactable)
+    def removeChild(self, child):
+        self._order.pop(child, None)
+        self._stale.discard(child)
+        self.unindex(child)
+        self._polygons = None
+        self._hoverBox = None
+        if self._hover == child:
+            self._hover = None
+        if Util._hoveredSelector == child:
+            Util.hoverSelector(None)
+        return super().removeChild(child)
+    
+    # Marks a moved or reshaped child for reindexing on the next query
+    def reindex(self, child):
+        if child._parent == self:
+            self._stale.add(child)
+            self._polygons = None
+            self._hoverBox = None
+    
+    # Removes a child from all cells it covers
+    def unindex(self, child):
+        
+        for cell in self._covers.pop(child, ()):
+            entries = self._cells[cell]
+            entries.discard(child)
+            if not entries:
+                del self._cells[cell]
+    
+    # Moves outdated children into the cells covered by their bounds
+    def updateIndex(self):
+        
+        for child in self._stale:
+            self.unindex(child)
+            
+            xo, yo, xc, yc = child.getBounds()
+            xo += child._pos[0]
+            yo += child._pos[1]
+            xc += child._pos[0]
+            yc += child._pos[1]
+            
+            cells = [(i, j) for i in range(math.floor(xo / self._cellSize), math.floor(xc / self._cellSize) + 1)
+                            for j in range(math.floor(yo / self._cellSize), math.floor(yc / self._cellSize) + 1)]
+            for cell in cells:
+                self._cells.setdefault(cell, set()).add(child)
+            self._covers[child] = cells
+        
+        self._stale.clear()
+    
+    # Gets children whose bounds come within pad of a position, in child order
+    def getCandidates(self, pos, pad):
+        return self.getCandidatesIn(pos[0] - pad, pos[1] - pad, pos[0] + pad, pos[1] + pad)
+    
+    # Gets children in cells overlapping a box, in child order
+    def getCandidatesIn(self, xo, yo, xc, yc):
+        
+        self.updateIndex()
+        
+        io, ic = math.floor(xo / self._cellSize), math.floor(xc / self._cellSize)
+        jo, jc = math.floor(yo / self._cellSize), math.floor(yc / self._cellSize)
+        
+        # Large boxes go through occupied cells instead of all cells in the box
+        found = set()
+        if (ic - io + 1) * (jc - jo + 1) > len(self._cells):
+            for (i, j), entries in self._cells.items():
+                if io <= i and i <= ic and jo <= j and j <= jc:
+                    found.update(entries)
+        else:
+            for i in range(io, ic + 1):
+                for j in range(jo, jc + 1):
+                    found.update(self._cells.get((i, j), ()))
+        
+        return sorted(found, key=self._order.__getitem__)
+    
+    # Gets visible selectors with their centre inside a lasso polygon of container positions
+    def getSelectorsIn(self, lasso):
+        
+        if len(lasso) < 3:
+            return []
+        
+        # Only selectors near the lasso can be inside
+        xs = [x for x, y in lasso]
+        ys = [y for x, y in lasso]
+        candidates = [child for child in self.getCandidatesIn(min(xs), min(ys), max(xs), max(ys))
+                      if child._visible and child._active and len(child._vertices) > 2]
+        
+        centres = []
+        for child in candidates:
+            xo, yo, xc, yc = child.getBounds()
+            centres.append((child._pos[0] + (xo + xc) / 2, child._pos[1] + (yo + yc) / 2))
+        
+        return [child for child, inside in zip(candidates, Polygons.contains(lasso, centres)) if inside]
+    
+    # Gets first visible selector containing each of the given container positions, None where there is none
+    def getSelectorsAt(self, points):
+        
+        # Repack polygons only after selectors changed
+        if self._polygons is None:
+            self._polygons = Polygons.Polygons([[(selector._pos[0] + vertex._pos[0], selector._pos[1] + vertex._pos[1])
+                                    for vertex in selector._vertices] for selector in self._selectors])
+        
+        mask = [selector._visible and selector._active for selector in self._selectors]
+        return [self._selectors[index] if index >= 0 else None for index in self._polygons.query(points, mask)]
+    
+    # Gets visible selector under the cursor, only re-tests after leaving the box of the last result
+    def hover(self, context, pos):
+        
+        # Get mouse offset
+        x = pos[0] - self._pos[0]
+        y = pos[1] - self._pos[1]
+        
+        # Still inside the last result, only its own shape needs checking
+        box = self._hoverBox
+        if box and box[0] <= x and x <= box[2] and box[1] <= y and y <= box[3]:
+            hover = self._hover
+            if hover is None:
+                return None
+            if hover._visible and hover.isInside(context, (x - hover._pos[0], y - hover._pos[1])):
+                return hover
+        
+        # Test candidates near the cursor, selector owns whatever part of it got hit
+        self._hover = None
+        self._hoverBox = None
+        candidates = self.getCandidates((x, y), 0.0)
+        for child in self.getHitCandidates(context, (x, y)) if candidates else []:
+            if child._visible and child.hit(context, (x, y)):
+                xo, yo, xc, yc = child.getBounds()
+                self._hover = child
+                self._hoverBox = (xo + child._pos[0], yo + child._pos[1], xc + child._pos[0], yc + child._pos[1])
+                return child
+        
+        # Nothing can be hit anywhere in an empty cell
+        if not candidates:
+            i = math.floor(x / self._cellSize)
+            j = math.floor(y / self._cellSize)
+            self._hoverBox = (i * self._cellSize, j * self._cellSize, (i + 1) * self._cellSize, (j + 1) * self._cellSize)
+        return None
+    
+    # Gets vertices with their handle inside a lasso polygon of container positions
+    def getVerticesIn(self, lasso):
+        
+        if len(lasso) < 3:
+            return []
+        
+        # Only selectors near the lasso can have vertices inside
+        xs = [x for x, y in lasso]
+        ys = [y for x, y in lasso]
+        vertices = [vertex for child in self.getCandidatesIn(min(xs), min(ys), max(xs), max(ys))
+                    if child._visible and child._edit for vertex in child._vertices]
+        
+        points = [(vertex._parent._pos[0] + vertex._pos[0], vertex._parent._pos[1] + vertex._pos[1]) for vertex in vertices]
+        return [vertex for vertex, inside in zip(vertices, Polygons.contains(lasso, points)) if inside]
+    
+    # Gets selected vertices that are still part of a selector in this container
+    def getSelection(self):
+        
+        self._selectedVertices = [vertex for vertex in self._selectedVertices
+                                  if vertex._parent and vertex._parent._parent == self and vertex in vertex._parent._vertices]
+        return self._selectedVertices
+    
+    # Changes vertex selection, adds to it if extending
+    def selectVertices(self, vertices, extend):
+        
+        if not extend:
+            for vertex in self._selectedVertices:
+                vertex.setSelected(False)
+            self._selectedVertices = []
+        
+        for vertex in vertices:
+            if not vertex._selected:
+                vertex.setSelected(True)
+                self._selectedVertices.append(vertex)
+        
+        self._transformOrigin = None
+    
+    # Selects all vertices of the given selectors
+    def selectSelectors(self, selectors, extend):
+        self.selectVertices([vertex for selector in selectors for vertex in selector._vertices], extend)
+    
+    # Starts a group transform from current vertex positions, returns centre of the selection
+    def beginTransform(self):
+        
+        vertices = self.getSelection()
+        self._transformOrigin = numpy.array([(vertex._parent._pos[0] + vertex._pos[0], vertex._parent._pos[1] + vertex._pos[1])
+                                             for vertex in vertices], dtype=numpy.float64).reshape(-1, 2)
+        if not vertices:
+            return (0.0, 0.0)
+        
+        low = self._transformOrigin.min(axis=0)
+        high = self._transformOrigin.max(axis=0)
+        return (float(low[0] + high[0]) / 2, float(low[1] + high[1]) / 2)
+    
+    # Ends a group transform
+    def endTransform(self):
+        self._transformOrigin = None
+    
+    # Puts selection back exactly where the transform started and ends it, nothing gets snapped
+    def cancelTransform(self):
+        
+        origin = self._transformOrigin
+        if origin is not None and len(origin):
+            
+            affected = set()
+            for vertex, start in zip(self._selectedVertices, origin.tolist()):
+                selector = vertex._parent
+                vertex._pos = (start[0] - selector._pos[0], start[1] - selector._pos[1])
+                affected.add(selector)
+            
+            for selector in affected:
+                selector.updateMedians()
+            self.morphTwins(affected)
+            self.invalidate()
+        
+        self.endTransform()
+    
+    # Morphs twins of the given selectors that aren't among them to mirror them
+    def morphTwins(self, selectors):
+        
+        for selector in selectors:
+            twin = selector.getTwin()
+            if twin and twin not in selectors and len(twin._vertices) == len(selector._vertices):
+                for vertex, mirror in zip(selector._vertices, twin._vertices):
+                    x = selector._pos[0] + vertex._pos[0] + twin._pos[0]
+                    y = selector._pos[1] + vertex._pos[1] - twin._pos[1]
+                    mirror._pos = (-x, y)
+                twin.updateMedians()
+    
+    # Transforms selection from where it started by a 2x2 matrix around a pivot followed by an offset,
+    # all vertices in one pass, fixes up each affected selector once
+    def transformSelection(self, context, matrix, offset, pivot):
+        
+        origin = self._transformOrigin
+        if origin is None or not len(origin):
+            return
+        
+        pivot = numpy.array(pivot, dtype=numpy.float64)
+        positions = (origin - pivot) @ numpy.array(matrix, dtype=numpy.float64).T + pivot + numpy.array(offset, dtype=numpy.float64)
+        
+        # Snap to grid like single vertices do
+        grid = context.scene.enableRigSelector.grid
+        if grid > 0.0:
+            positions = numpy.floor(positions / grid + 0.5) * grid
+        
+        # Write back relative to each selector
+        affected = {}
+        for vertex, start, position in zip(self._selectedVertices, origin.tolist(), positions.tolist()):
+            selector = vertex._parent
+            vertex._pos = (position[0] - selector._pos[0], position[1] - selector._pos[1])
+            affected.setdefault(selector, []).append((vertex, start))
+        
+        for selector, entries in affected.items():
+            
+            # Keep mirrored ends on the median
+            for vertex, start in entries:
+                selector.correctMirror(context, vertex)
+            
+            # Put selector back where it started if it isn't convex anymore
+            if not selector.isConvex():
+                for vertex, start in entries:
+                    vertex._pos = (start[0] - selector._pos[0], start[1] - selector._pos[1])
+            
+            selector.updateMedians()
+        
+        # Morph twins that weren't transformed themselves
+        self.morphTwins(affected)
+        self.invalidate()
+    
+    @Util.Overrides(Symbols.Interactable)
+    def getHitCandidates(self, context, pos):
+        
+        # Only check children near the cursor, leave room for vertex handles while editing
+        pad = 8.0 * context.scene.enableRigSelector.scaleUI + 1.0
+        candidates = self.getCandidates(pos, pad)
+        if not candidates or any(child._edit for child in candidates):
+            return candidates
+        
+        # Without handles only shapes can be hit, find the owning one in a packed query
+        selector = self.getSelectorsAt([pos])[0]
+        return [selector] if selector else []
         
         
     # Gets building button from stored building index
@@ -300,6 +906,7 @@ class Container(Symbols.Interactable):
             # Actualls remove selector
             self._selectors.remove(selector)
             self.removeChild(selector)
+            self.invalidate()
     
     # Toggles edit mode on or off
     def toggleEdit(self, context, active):
@@ -307,6 +914,10 @@ class Container(Symbols.Interactable):
         # Toggle all selectors
         for selector in self._selectors:
             selector.toggleEdit(context, active)
+        
+        # Group selection only exists while editing
+        if not active:
+            self.selectVertices([], False)
     
     # Adds a vertex to a new button or current focus
     def addVertex(self, context, pos):
@@ -324,83 +935,101 @@ class Container(Symbols.Interactable):
         else:
             
             # Create new selector
-            building = Selectors.BoneSelector(Util.adaptToGrid((x, y), True))
+            building = Selectors.BoneSelector(Util.adaptToGrid(context, (x, y), True))
             self._selectors.append(building)
             self.addChild(building)
             self._building = self._selectors.index(building)
             
             # Select on creation
-            Util._selectedSelector = building
+            Util.selectSelector(building)
+        
+        self.invalidate()
     
     
-    @Util.Overrides(Symbols.Interactable)
-    def draw(self, context, parent, scale):
+    # Gets grid lines in screen space as (n, 2, 2) array, None if grid is disabled
+    def gridLines(self, context, parent, scale):
         
         # Get interface information 
         if self._parent and self._parent._parent:
-            size = self._parent._parent._size
-            ratio = (self._parent._parent._medianRatio, self._parent._parent._heightRatio)
-            origin = (parent[0] - self._parent._pos[0], parent[1] - self._parent._pos[1])
-            center = (parent[0], parent[1] + self._pos[1])
-            corner = (origin[0] + size[0], parent[1] + size[1])
+            interface = self._parent._parent
             
             # Render grid       
             grid = context.scene.enableRigSelector.grid
-            if grid > 0.0 and self._parent._parent._edit:
+            if grid > 0.0 and interface._edit:
                 
-                # Computes amount of lines
-                offset = (Util.roundTowards(size[0] * ratio[0], 0.5, grid), Util.roundTowards(size[1] * ratio[1], 0.5, grid))
-                start = (center[0] - offset[0], center[1] - offset[1])
-                end = (start[0] + size[0], start[1] + size[1])
+                # Rebuild only if layout changed
+                key = (tuple(interface._size), interface._medianRatio, interface._heightRatio, grid, tuple(parent), scale)
+                if key != self._gridKey:
+                    self._gridLines = self.buildGrid(parent, scale, grid)
+                    self._gridKey = key
                 
-                # Prevent overdraw
-                if start[0] < origin[0]:
-                    start = (start[0] + grid, start[1])
-                if start[1] < origin[1]:
-                    start = (start[0], start[1] + grid)
-                if end[0] > origin[0] + size[0]:
-                    end = (end[0] - grid, end[1])
-                if end[1] > origin[1] + size[1]:
-                    end = (end[0], end[1] - grid)
-                
-                hor = [[(px * scale, origin[1] * scale), (px * scale, corner[1] * scale)] for px in Util.frange(start[0], end[0], grid)]
-                ver = [[(origin[0] * scale, py * scale), (corner[0] * scale, py * scale)] for py in Util.frange(start[1], end[1], grid)]
-                vertices = [vertex for pair in (hor + ver) for vertex in pair]
-                indices = [(2*i, 2*i + 1) for i in range(0, len(hor + ver))]
-
-                shader = gpu.shader.from_builtin('2D_UNIFORM_COLOR')
-                batch = batch_for_shader(shader, 'LINES', {"pos": vertices}, indices=indices)
-
-                bgl.glEnable(bgl.GL_BLEND)
-                shader.bind()
-                shader.uniform_float("color", (0.0, 0.0, 0.0, 0.1))
-                batch.draw(shader)
-                bgl.glDisable(bgl.GL_BLEND)
-
-                '''
-                # Set GL options
-                bgl.glEnable(bgl.GL_BLEND)
-                bgl.glLineWidth(1)
-                bgl.glColor4f(0.0, 0.0, 0.0, 0.1)
-                                
-                # Render vertical lines
-                for x in Util.frange(start[0], end[0], grid):
-                    bgl.glBegin(bgl.GL_LINES)
-                    bgl.glVertex2f(x * scale, origin[1] * scale)
-                    bgl.glVertex2f(x * scale, corner[1] * scale)
-                    bgl.glEnd()
-                
-                # Render horizontal lines   
-                for y in Util.frange(start[1], end[1], grid):
-                    bgl.glBegin(bgl.GL_LINES)
-                    bgl.glVertex2f(origin[0] * scale, y * scale)
-                    bgl.glVertex2f(corner[0] * scale, y * scale)
-                    bgl.glEnd()
-                '''
-            
-        super().draw(context, parent, scale)
+                return self._gridLines
+        
+        return None
+    
+    # Builds grid lines for a given layout
+    def buildGrid(self, parent, scale, grid):
+        
+        size = self._parent._parent._size
+        ratio = (self._parent._parent._medianRatio, self._parent._parent._heightRatio)
+        origin = (parent[0] - self._parent._pos[0], parent[1] - self._parent._pos[1])
+        center = (parent[0], parent[1] + self._pos[1])
+        corner = (origin[0] + size[0], parent[1] + size[1])
+        
+        # Computes amount of lines
+        offset = (Util.roundTowards(size[0] * ratio[0], 0.5, grid), Util.roundTowards(size[1] * ratio[1], 0.5, grid))
+        start = (center[0] - offset[0], center[1] - offset[1])
+        end = (start[0] + size[0], start[1] + size[1])
+        
+        # Prevent overdraw
+        if start[0] < origin[0]:
+            start = (start[0] + grid, start[1])
+        if start[1] < origin[1]:
+            start = (start[0], start[1] + grid)
+        if end[0] > origin[0] + size[0]:
+            end = (end[0] - grid, end[1])
+        if end[1] > origin[1] + size[1]:
+            end = (end[0], end[1] - grid)
+        
+        # Vertical lines span the full height, horizontal lines the full width
+        xs = numpy.arange(start[0], end[0], grid, dtype=numpy.float32)
+        ys = numpy.arange(start[1], end[1], grid, dtype=numpy.float32)
+        
+        hor = numpy.empty((len(xs), 2, 2), dtype=numpy.float32)
+        hor[:, :, 0] = xs[:, None]
+        hor[:, 0, 1] = origin[1]
+        hor[:, 1, 1] = corner[1]
+        
+        ver = numpy.empty((len(ys), 2, 2), dtype=numpy.float32)
+        ver[:, 0, 0] = origin[0]
+        ver[:, 1, 0] = corner[0]
+        ver[:, :, 1] = ys[:, None]
+        
+        return numpy.concatenate((hor, ver)) * scale
+    
+    @Util.Overrides(Symbols.Interactable)
+    @Profiler.timed("Container")
+    def pack(self, context, parent, scale, packer):
+        
+        # Pack grid
+        lines = self.gridLines(context, parent, scale)
+        if lines is not None and len(lines):
+            packer.lines(lines, (0.0, 0.0, 0.0, 0.1))
+        
+        super().pack(context, parent, scale, packer)
     
     
+    # Checks whether any selector linked to the given names (all if None) looks different since the last check
+    def updateLinks(self, context, names):
+        
+        changed = False
+        for selector in self._selectors:
+            if names is None or selector.isLinkedTo(context, names):
+                signature = selector.getLinkSignature(context)
+                if signature != selector._signature:
+                    selector._signature = signature
+                    changed = True
+        return changed
     
     # Update visibility depending on whether any buttons are visible
     def updateVisibility(self, context):
@@ -3,6 +3,9 @@ import bpy
 from bpy.types import Panel
 
 from .Widgets.Base import Util
+from .Widgets.Base import Shaders
+from .Widgets.Base import Textures
+from .Widgets.Base import Profiler
 from . import Groups
 from . import Operators
 
@@ -10,7 +13,7 @@ bl_info = {
     "name": "TGOR Rig Selector Interface",
     "author": "Hopfel, updated by RED_EYE)",
     "version": (2, 0),
-    "blender": (2, 80, 0),
+    "blender": (3, 0, 0),
     "location": "View3D > Properties > Rig Selector",
     "description": "Enables the user to select bones with a custom floating viewport interface and gives an ability to create/edit these interfaces.",
     "warning": "",
@@ -55,6 +58,9 @@ class TGOR_PT_RigSelectorPanel(Panel):
             row = box.row(align=True)
             row.prop(enableRigSelector, "scaleUI", text="Vertex scale")
             row.prop(enableRigSelector, "scaleAll", text="All scale")
+            row = box.row(align=True)
+            row.prop(enableRigSelector, "batching", text="Batching")
+            row.prop(enableRigSelector, "coalesce", text="Coalesce")
                     
             layout.label(text="Add/Remove", icon='ZOOM_IN')
             box = layout.box()
@@ -66,6 +72,13 @@ class TGOR_PT_RigSelectorPanel(Panel):
             row.prop_search(enableRigSelector, "background", bpy.data, "images", text="", icon='IMAGE_DATA')
             row.operator("view3d.rig_imageselector", text = "Set Background")
                     
+            if enableRigSelector.editing:
+                row = box.row(align=True)
+                row.operator("view3d.rig_transform", text = "Move").mode = 'MOVE'
+                row.operator("view3d.rig_transform", text = "Scale").mode = 'SCALE'
+                row.operator("view3d.rig_transform", text = "Rotate").mode = 'ROTATE'
+                row.operator("view3d.rig_transform", text = "Mirror").mode = 'MIRROR'
+            
             row = box.row(align=True)
             row.operator("view3d.rig_add", text = "Add interfaces")
             row.operator("view3d.rig_remove", text = "Remove interfaces")
@@ -82,6 +95,17 @@ class TGOR_PT_RigSelectorPanel(Panel):
             row = box.row(align=True)
             row.prop(enableRigSelector, "autosave", text="Autosave")
             
+            layout.label(text="Profiling", icon='TIME')
+            box = layout.box()
+            row = box.row(align=True)
+            row.prop(enableRigSelector, "profiling", text="Profiling")
+            row.operator("view3d.rig_export_profile", text = "Export")
+            
+            if enableRigSelector.profiling:
+                stats = Profiler.getStats()
+                box.label(text="%d frames" % stats["frames"])
+                box.label(text="p50 %.2fms  p95 %.2fms  max %.2fms" % (stats["p50"] * 1000.0, stats["p95"] * 1000.0, stats["max"] * 1000.0))
+            
             # Init operation on first draw
             if Util._interfaces == None:
                 
@@ -119,6 +143,17 @@ def register():
         keymaps.append((keyMap, item))
         item = keyMap.keymap_items.new(idname='view3d.rig_selector', type='LEFTMOUSE', value='PRESS', shift=True)
         keymaps.append((keyMap, item))
+        item = keyMap.keymap_items.new(idname='view3d.rig_hover', type='MOUSEMOVE', value='ANY')
+        keymaps.append((keyMap, item))
+        
+        # Box select on ctrl drag, lasso on ctrl right drag, stroke on ctrl alt drag, shift extends
+        for button, alt, lasso, stroke in (('LEFTMOUSE', False, False, False), ('RIGHTMOUSE', False, True, False), ('LEFTMOUSE', True, False, True)):
+            for shift in (False, True):
+                item = keyMap.keymap_items.new(idname='view3d.rig_region', type=button, value='PRESS', ctrl=True, shift=shift, alt=alt)
+                item.properties.lasso = lasso
+                item.properties.stroke = stroke
+                item.properties.extend = shift
+                keymaps.append((keyMap, item))
         #item = keyMap.keymap_items.new(idname='view3d.rig_selector', type='RIGHTMOUSE', value='PRESS', shift=False)
         #keymaps.append((keyMap, item))
         #item = keyMap.keymap_items.new(idname='view3d.rig_selector', type='RIGHTMOUSE', value='PRESS', shift=True)
@@ -134,6 +169,13 @@ def unregister():
     
     Groups.unregister()
     
+    # Drop compiled shaders
+    Shaders.unregister()
+    Textures.unregister()
+    if bpy.app.timers.is_registered(Operators.TGOR_OT_RigSelectorModal.rebuildProxies):
+        bpy.app.timers.unregister(Operators.TGOR_OT_RigSelectorModal.rebuildProxies)
+    Profiler.setEnabled(False)
+    
     # Unregister keymap to left mouse
     for keyMap, item in keymaps:
         keyMap.keymap_items.remove(item)
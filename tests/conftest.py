@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# Tests run on plain Python, widgets come straight from the add-on folder and fixtures from tools
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, "tools"))
+
+import benchmark
+from Widgets.Base import Util
+
+####################################################################################
+
+@pytest.fixture(autouse=True)
+def resetUtil():
+    
+    # Selection and hover are module globals shared by all interfaces
+    Util._interfaces = []
+    Util._selectedSelector = None
+    Util._selectedInterface = None
+    Util._hoveredSelector = None
+    Util._redraw = False
+    yield
+
+@pytest.fixture
+def context():
+    return benchmark.buildContext()
@@ -0,0 +1,137 @@
+import benchmark
+from Widgets.Base import Commands
+from Widgets.Base import Packer
+from Widgets.Base import Util
+
+####################################################################################
+
+# Composites interfaces in one pass like the draw handler does, returns the recorded counters
+def record(context, interfaces, recorder, scale = 1.0):
+    
+    recorder.reset()
+    recorder.beginPass()
+    for interface in interfaces:
+        interface.composite(context, scale, recorder)
+    recorder.endPass()
+    return recorder.getCounters()
+
+####################################################################################
+
+def test_draw_list_keeps_commands_in_order():
+    
+    drawList = Commands.DrawList()
+    packer = Packer.Packer()
+    packer.begin(drawList)
+    packer.rectangle(0.0, 0.0, 10.0, 10.0, (1.0, 0.0, 0.0, 1.0))
+    packer.rectangle(20.0, 0.0, 30.0, 10.0, (0.0, 1.0, 0.0, 1.0))
+    packer.finish()
+    
+    # Both rectangles merge into one command of four triangles
+    commands = drawList.getCommands()
+    assert [command[0] for command in commands] == ['TRIS']
+    assert len(commands[0][1]) == 12
+    
+    recorder = Commands.Recorder()
+    recorder.execute(drawList)
+    counters = recorder.getCounters()
+    assert counters["commands"] == 1
+    assert counters["draws"] == 1
+    assert counters["primitives"] == 4
+    assert counters["vertices"] == 12
+
+def test_first_frame_renders_cache_in_one_batch(context):
+    
+    interface = benchmark.buildGrid(context, 100)
+    counters = record(context, [interface], Commands.Recorder())
+    
+    # All selectors are merged into a single draw, the cache is composited with another
+    assert counters["renders"] == 1
+    assert counters["composites"] == 1
+    assert counters["commands"] == 1
+    assert counters["draws"] == 2
+    assert counters["primitives"] > 100 * 2
+
+def test_unchanged_frame_only_composites(context):
+    
+    interface = benchmark.buildGrid(context, 100)
+    recorder = Commands.Recorder()
+    record(context, [interface], recorder)
+    counters = record(context, [interface], recorder)
+    
+    assert counters["renders"] == 0
+    assert counters["commands"] == 0
+    assert counters["draws"] == 1
+    assert counters["primitives"] == 2
+
+def test_moved_selector_rerenders_cache(context):
+    
+    interface = benchmark.buildGrid(context, 100)
+    recorder = Commands.Recorder()
+    first = record(context, [interface], recorder)
+    
+    selector = interface._median._container._selectors[0]
+    selector._pos = (selector._pos[0] + 1.0, selector._pos[1])
+    selector.moved()
+    counters = record(context, [interface], recorder)
+    
+    assert counters["renders"] == 1
+    assert counters["primitives"] == first["primitives"]
+
+def test_hover_does_not_rerender_cache(context):
+    
+    interface = benchmark.buildGrid(context, 100)
+    recorder = Commands.Recorder()
+    record(context, [interface], recorder)
+    
+    # Hover outline is drawn on top of the cache as its own command
+    Util.hoverSelector(interface._median._container._selectors[0])
+    counters = record(context, [interface], recorder)
+    
+    assert counters["renders"] == 0
+    assert counters["composites"] == 1
+    assert counters["commands"] == 1
+
+def test_offscreen_interface_is_culled(context):
+    
+    context.scene.enableRigSelector.clamp = False
+    interface = benchmark.buildGrid(context, 100)
+    interface._pos = (context.region.width + 100.0, 10.0)
+    counters = record(context, [interface], Commands.Recorder())
+    
+    assert counters["renders"] == 0
+    assert counters["composites"] == 0
+    assert counters["draws"] == 0
+
+def test_partially_visible_interface_packs_visible_selectors(context):
+    
+    full = record(context, [benchmark.buildGrid(context, 100)], Commands.Recorder())
+    
+    # Region only shows part of the interface
+    context.scene.enableRigSelector.clamp = False
+    context.region.width = 120
+    counters = record(context, [benchmark.buildGrid(context, 100)], Commands.Recorder())
+    
+    assert counters["renders"] == 1
+    assert 0 < counters["primitives"] < full["primitives"]
+
+def test_oversized_interface_draws_directly(context):
+    
+    interface = benchmark.buildGrid(context, 100)
+    recorder = Commands.Recorder()
+    recorder._maxSize = 64
+    counters = record(context, [interface], recorder)
+    
+    assert counters["renders"] == 0
+    assert counters["composites"] == 0
+    assert counters["commands"] >= 1
+    assert interface._cache is None
+
+def test_state_changes_match_gpu_backend(context):
+    
+    # Pass sets ALPHA, each composite switches to ALPHA_PREMULT and back, pass ends with NONE
+    interfaces = [benchmark.buildGrid(context, 10), benchmark.buildGrid(context, 10)]
+    interfaces[1]._pos = (400.0, 10.0)
+    counters = record(context, interfaces, Commands.Recorder())
+    
+    assert counters["composites"] == 2
+    assert counters["stateChanges"] == 1 + 2 * 2 + 1
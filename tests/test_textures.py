@@ -0,0 +1,126 @@
+import sys
+import types
+
+import numpy
+import pytest
+
+from Widgets.Base import Textures
+
+####################################################################################
+
+class FakeImage():
+    """Stands in for a Blender image, loads its pixels when the size is read"""
+    
+    def __init__(self, width, height, loaded = False, source = 'FILE', dirty = False, packed = None):
+        self._size = (width, height)
+        self.has_data = loaded
+        self.source = source
+        self.is_dirty = dirty
+        self.packed_file = packed
+        self.is_float = False
+        self.colorspace_settings = types.SimpleNamespace(name='sRGB')
+        self.pixels = types.SimpleNamespace(foreach_get=self.readPixels)
+        self.reads = 0
+        self.frees = 0
+    
+    @property
+    def size(self):
+        self.has_data = True
+        return self._size
+    
+    def readPixels(self, buffer):
+        self.reads += 1
+        buffer[:] = numpy.linspace(0.0, 1.0, len(buffer), dtype=numpy.float32)
+    
+    def buffers_free(self):
+        self.has_data = False
+        self.frees += 1
+
+class FakeBuffer():
+    """Checks initial data against the dimensions like Blender's gpu.types.Buffer does"""
+    
+    def __init__(self, format, dimensions, data):
+        shape = (dimensions,) if isinstance(dimensions, int) else tuple(dimensions)
+        if numpy.shape(data) != shape:
+            raise TypeError("Buffer dimensions don't match the given data")
+        self.shape = shape
+
+class FakeTexture():
+    
+    def __init__(self, size, format, data):
+        self.size = size
+        self.format = format
+        self.data = data
+
+@pytest.fixture
+def images(monkeypatch):
+    
+    images = {}
+    monkeypatch.setattr(Textures, "getImage", images.get)
+    monkeypatch.setitem(sys.modules, "gpu", types.SimpleNamespace(
+        types=types.SimpleNamespace(Buffer=FakeBuffer, GPUTexture=FakeTexture),
+        texture=types.SimpleNamespace(from_image=lambda image: FakeTexture(image.size, 'RGBA8', None))))
+    Textures.unregister()
+    yield images
+    Textures.unregister()
+
+####################################################################################
+
+def test_proxy_uploads_flat_pixels_and_drops_them(images):
+    
+    images["background"] = FakeImage(512, 256)
+    texture = Textures.getProxy("background", 100.0, 50.0)
+    
+    # Smallest level covering 100x50 is 128x64
+    assert isinstance(texture, FakeTexture)
+    assert texture.size == (128, 64)
+    assert texture.format == 'SRGB8_A8'
+    assert texture.data.shape == (128 * 64 * 4,)
+    
+    level = next(level for level in Textures._proxies["background"][1] if level[3] is texture)
+    assert level[2] is None
+    assert Textures.getProxy("background", 100.0, 50.0) is texture
+
+def test_proxy_of_removed_image_is_dropped(images):
+    
+    images["background"] = FakeImage(512, 256)
+    assert Textures.buildProxies("background")
+    
+    del images["background"]
+    assert Textures.getProxy("background", 100.0, 50.0) is None
+    assert "background" not in Textures._proxies
+
+def test_only_images_loaded_here_are_freed(images):
+    
+    images["ours"] = FakeImage(512, 256, loaded=False)
+    images["theirs"] = FakeImage(512, 256, loaded=True)
+    Textures.getProxy("ours", 100.0, 50.0)
+    Textures.getProxy("theirs", 100.0, 50.0)
+    
+    assert images["ours"].frees == 1
+    assert images["theirs"].frees == 0
+
+@pytest.mark.parametrize("options", [{"dirty": True}, {"source": 'GENERATED'}, {"packed": object()}])
+def test_edited_generated_and_packed_images_are_never_freed(images, options):
+    
+    images["background"] = FakeImage(512, 256, loaded=False, **options)
+    Textures.getProxy("background", 100.0, 50.0)
+    
+    assert images["background"].frees == 0
+
+def test_proxy_rebuilds_are_throttled_while_image_changes(images, monkeypatch):
+    
+    image = images["background"] = FakeImage(512, 256)
+    first = Textures.getProxy("background", 100.0, 50.0)
+    
+    # Painting keeps reporting changes, old proxies stay until the interval passed
+    monkeypatch.setattr(Textures, "_rebuildInterval", 60.0)
+    Textures.refresh("background")
+    assert Textures.getProxy("background", 100.0, 50.0) is first
+    assert image.reads == 1
+    assert 0.0 < Textures.getOutdated()["background"] <= 60.0
+    
+    monkeypatch.setattr(Textures, "_rebuildInterval", 0.0)
+    assert Textures.getProxy("background", 100.0, 50.0) is not first
+    assert image.reads == 2
+    assert Textures.getOutdated() == {}
@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import types
+
+# Widgets are imported straight from the add-on folder, Blender isn't needed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Widgets.Base import Commands
+from Widgets import Surfaces
+from Widgets import Selectors
+
+####################################################################################
+
+# Builds a stand-in for Blender's context with the settings and region the widgets read
+def buildContext(width = 2000, height = 2000):
+    
+    settings = types.SimpleNamespace(alpha=0.2, batching=True, clamp=True, grid=0.0, scaleAll=1.0,
+                                     scaleUI=1.0, symmetry=False, editing=False)
+    scene = types.SimpleNamespace(enableRigSelector=settings, objects={})
+    region = types.SimpleNamespace(width=width, height=height, x=0, y=0, as_pointer=lambda: 1)
+    return types.SimpleNamespace(scene=scene, region=region, window_manager=None, active_object=None)
+
+# Builds an interface with a square grid of triangle selectors
+def buildGrid(context, count, spacing = 14.0):
+    
+    columns = max(int(count ** 0.5), 1)
+    side = columns * spacing
+    interface = Surfaces.Interface((10.0, 10.0), (side * 2.0, side * 2.0))
+    interface.prepare(context)
+    
+    container = interface._median._container
+    for index in range(count):
+        x = (index % columns) * spacing - side / 2
+        y = (index // columns) * spacing - side / 2
+        selector = Selectors.Selector((x, y), (1.0, 0.0, 0.0, 1.0))
+        container._selectors.append(selector)
+        container.addChild(selector)
+        for offset in ((10.0, 0.0), (10.0, 10.0), (0.0, 10.0)):
+            selector.addVertex(context, (x + offset[0], y + offset[1]))
+        
+        # Leave build mode like a loaded selector
+        selector._build = False
+        selector._edit = False
+        for vertex in selector._vertices:
+            vertex._active = False
+    return interface
+
+# Composites interfaces repeatedly with a recording backend, returns average milliseconds and counters per pass.
+# Modes are 'cached' (nothing changed), 'repack' (caches redrawn, selectors reuse their packed geometry)
+# and 'cold' (selectors pack from scratch)
+def measure(context, interfaces, scale, mode = 'repack', repeats = 10):
+    
+    recorder = Commands.Recorder()
+    
+    # Warm up caches so only the measured mode's work is counted
+    for interface in interfaces:
+        interface.composite(context, scale, recorder)
+    recorder.reset()
+    
+    start = time.perf_counter()
+    for _ in range(repeats):
+        
+        if mode != 'cached':
+            for interface in interfaces:
+                if mode == 'cold':
+                    for selector in interface._median._container._selectors:
+                        selector._packedKey = None
+                interface._dirty = True
+        
+        recorder.beginPass()
+        for interface in interfaces:
+            interface.composite(context, scale, recorder)
+        recorder.endPass()
+    seconds = time.perf_counter() - start
+    
+    counters = recorder.getCounters()
+    return {
+        "ms": seconds / repeats * 1000.0,
+        "counters": {name: value / repeats for name, value in counters.items()},
+    }
+
+####################################################################################
+
+# Usage: python tools/benchmark.py [selectors] [scale]
+if __name__ == "__main__":
+    
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 900
+    scale = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    
+    context = buildContext()
+    interface = buildGrid(context, count)
+    for mode in ('cached', 'repack', 'cold'):
+        result = measure(context, [interface], scale, mode)
+        print("%-7s %8.2f ms  %s" % (mode, result["ms"], result["counters"]))